@@ -28,6 +28,12 @@ def get_base64_of_bin_file(bin_file):
         data = f.read()
     return base64.b64encode(data).decode()
 
+# Rows read from an upload to check its columns
+VALIDATION_SAMPLE_ROWS = 100
+
+# risk_score is stored as float32; show it with one decimal like the model output
+SCORE_FORMATTERS = {'risk_score': '{:.1f}'.format}
+
 # --- Validate CSV Format ---
 def validate_csv_format(df):
     """Check if CSV has required columns"""
@@ -76,9 +82,10 @@ with st.sidebar:
     
     if uploaded_file is not None:
         st.success("File Uploaded Successfully!")
-        # Validate format immediately after upload
+        # Validate format immediately after upload (header + sample rows only;
+        # the full file is parsed once, in process_data)
         try:
-            temp_df = pd.read_csv(uploaded_file)
+            temp_df = pd.read_csv(uploaded_file, nrows=VALIDATION_SAMPLE_ROWS)
             is_valid, required_cols, missing_cols = validate_csv_format(temp_df)
             
             if not is_valid:
@@ -109,6 +116,8 @@ with st.sidebar:
                     st.caption("📊 Data saved for model improvement")
                 except Exception as e:
                     st.warning(f"Could not save file: {str(e)}")
+                # Rewind again for the single full parse in process_data
+                uploaded_file.seek(0)
         except Exception as e:
             st.error(f"Error reading file: {str(e)}")
             uploaded_file = None
@@ -175,7 +184,7 @@ if search_query:
     if search_query in df['customer_id'].values:
         customer_data = df[df['customer_id'] == search_query].iloc[0]
         risk_tier = customer_data['risk_tier']
-        risk_score = customer_data['risk_score']
+        risk_score = f"{customer_data['risk_score']:.1f}"
         
         # Color-coded success message based on risk tier
         if risk_tier == 'Intervene':
@@ -245,7 +254,7 @@ with tabs[1]:
             color = "#E31837" if cust['risk_tier'] == 'Intervene' else "#FFA500" if cust['risk_tier'] == 'Engage' else "#0057A5"
             st.markdown(f"""
             <div style="background-color: {color}; padding: 15px; border-radius: 8px; color: white; font-weight: bold; margin-bottom: 20px;">
-                Customer {selected_customer} is {cust['risk_tier'].upper()} (Score: {cust['risk_score']})
+                Customer {selected_customer} is {cust['risk_tier'].upper()} (Score: {cust['risk_score']:.1f})
             </div>
             """, unsafe_allow_html=True)
             
@@ -287,7 +296,7 @@ with tabs[2]:
     if not high_risk_df.empty:
         high_risk_df_display = high_risk_df.reset_index(drop=True)
         high_risk_df_display.insert(0, 'Sl No', range(1, len(high_risk_df_display) + 1))
-        st.write(high_risk_df_display.to_html(index=False), unsafe_allow_html=True)
+        st.write(high_risk_df_display.to_html(index=False, formatters=SCORE_FORMATTERS), unsafe_allow_html=True)
     else:
         st.success("No High-Risk accounts detected.")
 
@@ -319,6 +328,6 @@ with tabs[3]:
     if not filtered_df.empty:
         filtered_df_display = filtered_df.reset_index(drop=True)
         filtered_df_display.insert(0, 'Sl No', range(1, len(filtered_df_display) + 1))
-        st.write(filtered_df_display.to_html(index=False), unsafe_allow_html=True)
+        st.write(filtered_df_display.to_html(index=False, formatters=SCORE_FORMATTERS), unsafe_allow_html=True)
     else:
         st.warning("No customers match the selected filters.")
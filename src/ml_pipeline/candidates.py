@@ -0,0 +1,95 @@
+"""
+Candidate Training Module
+Trains several candidate configurations in parallel worker processes for
+champion/challenger selection
+"""
+
+import time
+import logging
+
+from joblib import Parallel, cpu_count, delayed
+
+from .model_trainer import ESTIMATORS, ModelTrainer
+
+logging.basicConfig(
+    filename='logs/retraining.log',
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+def candidate_name(candidate):
+    """Label of a candidate spec: its 'name', else its estimator"""
+    return candidate.get('name') or candidate.get('estimator', 'random_forest')
+
+def _train_candidate(candidate, version, X, y, split, split_method, random_state, n_threads):
+    """Train and save one candidate in a worker; returns a summary, never the model"""
+    name = candidate_name(candidate)
+    try:
+        estimator = candidate.get('estimator', 'random_forest')
+        params = dict(candidate.get('params') or {})
+        if 'n_jobs' in ESTIMATORS.get(estimator, (None, {}))[1]:
+            # Share the cores between the workers instead of each using all
+            params.setdefault('n_jobs', n_threads)
+        trainer = ModelTrainer(
+            estimator=estimator, sampling=candidate.get('sampling'), params=params or None
+        )
+        _, metrics, version = trainer.train_model_arrays(
+            X, y, random_state=random_state, split=split, version=version,
+            split_method=split_method
+        )
+        return {
+            'name': name,
+            'version': version,
+            'estimator': estimator,
+            'auc': float(metrics['test_auc']),
+            'accuracy': float(metrics['test_accuracy']),
+            'training': metrics['training']
+        }
+    except Exception as e:
+        logging.error(f"Candidate {name} failed: {str(e)}")
+        return {'name': name, 'version': None, 'error': str(e)}
+
+def train_candidates(candidates, X, y, split, versions, n_jobs=-1, random_state=42,
+                     split_method=None):
+    """
+    Fit every candidate on the same split, one worker process each
+
+    X and y may be read-only memory maps from the FeatureStore; joblib
+    passes them to the workers by file reference, so the feature matrix is
+    not copied per candidate. Each candidate is saved under its preassigned
+    version like a normal training run. A failing candidate is reported
+    and does not stop the others.
+
+    Args:
+        candidates: List of specs, e.g. {'name': 'rf_deep', 'estimator':
+            'random_forest', 'params': {'max_depth': 16}, 'sampling': None}
+        X: Feature matrix
+        y: Binary labels
+        split: (train_idx, test_idx) shared by all candidates
+        versions: One version string per candidate (ModelTrainer.next_versions)
+        n_jobs: Worker processes (-1 for one per candidate, up to the core count)
+        random_state: Random seed
+        split_method: How split was made (see ModelTrainer.split_indices)
+
+    Returns:
+        list: Per-candidate summaries (name, version, auc, accuracy,
+            training; or error), in candidate order
+    """
+    if len(versions) != len(candidates):
+        raise ValueError("One version is needed per candidate")
+    cores = cpu_count()
+    n_workers = min(len(candidates), cores if n_jobs == -1 else n_jobs)
+    n_threads = max(1, cores // n_workers)
+
+    start = time.perf_counter()
+    results = Parallel(n_jobs=n_workers, backend='loky')(
+        delayed(_train_candidate)(
+            candidate, version, X, y, split, split_method, random_state, n_threads
+        )
+        for candidate, version in zip(candidates, versions)
+    )
+    logging.info(
+        f"Trained {len(candidates)} candidates on {n_workers} workers "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return results
@@ -5,9 +5,37 @@ Handles data ingestion, storage, merging, and cleaning for continuous learning.
 
 import pandas as pd
 import os
+import json
+import hashlib
 from datetime import datetime
 import shutil
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Parquet support is optional; without pyarrow the master stays a CSV
+try:
+    import pyarrow
+    import pyarrow.compute
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Bytes copied per read when staging an upload
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Typed schema for the master dataset (matches the load_data column list)
+MASTER_DTYPES = {
+    'customer_id': 'string',
+    'credit_limit': 'float32',
+    'utilisation_pct': 'float32',
+    'avg_payment_ratio': 'float32',
+    'min_due_paid_frequency': 'float32',
+    'merchant_mix_index': 'float32',
+    'cash_withdrawal_pct': 'float32',
+    'recent_spend_change_pct': 'float32',
+    'dpd_bucket_next_month': 'float32'
+}
 
 # Setup logging
 logging.basicConfig(
@@ -22,11 +50,27 @@ class DataManager:
         self.training_data_dir = 'data/training'
         self.archive_dir = 'data/archive'
         self.master_dataset_path = os.path.join(self.training_data_dir, 'master_dataset.csv')
+        self.upload_index_path = 'data/upload_index.json'
+        self.master_parquet_path = os.path.join(self.training_data_dir, 'master_dataset.parquet')
+        self.delta_dir = os.path.join(self.training_data_dir, 'deltas')
+        self.max_delta_segments = 20
+        self.critical_columns = ['customer_id', 'credit_limit', 'utilisation_pct']
+        self.manifest_path = os.path.join(self.training_data_dir, 'manifest.json')
+        self.ingest_workers = min(8, os.cpu_count() or 1)
+        self.last_ingest_report = None
+        self.last_merged_ids = None
         
     def store_new_data(self, uploaded_file, filename=None):
         """
         Store uploaded CSV file with timestamp
         
+        The uploaded bytes are copied as-is (no CSV round-trip).
+        Uploads are content-addressed: if a file with the same bytes is
+        already staged or archived (e.g. on a Streamlit rerun), nothing is
+        written and the existing path is returned. In-memory uploads (the
+        Streamlit uploader's) are hashed in place, so a duplicate never
+        touches the disk.
+        
         Args:
             uploaded_file: File object from Streamlit uploader
             filename: Optional custom filename
@@ -34,34 +78,101 @@ class DataManager:
         Returns:
             str: Path to saved file
         """
+        tmp_path = os.path.join(self.new_data_dir, f".upload_{os.getpid()}_{id(uploaded_file)}.tmp")
+        data = None
         try:
+            if hasattr(uploaded_file, 'getbuffer'):
+                # Already in memory; hash it without copying
+                data = uploaded_file.getbuffer()
+            elif not hasattr(uploaded_file, 'read'):
+                # If it's already a dataframe
+                data = uploaded_file.to_csv(index=False).encode('utf-8')
+            
+            if data is not None:
+                content_hash = hashlib.sha256(data).hexdigest()
+            else:
+                # A stream can only be read once: copy it to a temp file
+                # while hashing it
+                digest = hashlib.sha256()
+                with open(tmp_path, 'wb') as out:
+                    for chunk in iter(lambda: uploaded_file.read(UPLOAD_CHUNK_SIZE), b''):
+                        digest.update(chunk)
+                        out.write(chunk)
+                content_hash = digest.hexdigest()
+            
+            existing = self._find_staged_upload(content_hash)
+            if existing is not None:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                logging.info(f"Duplicate upload skipped, already stored as {existing}")
+                return existing
+            
             # Generate timestamp
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             
-            # Create filename
+            # Create filename (hash prefix keeps same-second uploads apart)
             if filename is None:
-                filename = f"upload_{timestamp}.csv"
+                filename = f"upload_{timestamp}_{content_hash[:8]}.csv"
             else:
                 name, ext = os.path.splitext(filename)
-                filename = f"{name}_{timestamp}{ext}"
+                filename = f"{name}_{timestamp}_{content_hash[:8]}{ext}"
             
-            # Save file
+            # Save file (readers never see a partial copy)
             filepath = os.path.join(self.new_data_dir, filename)
+            if data is not None:
+                with open(tmp_path, 'wb') as out:
+                    out.write(data)
+            os.replace(tmp_path, filepath)
             
-            # Read and save
-            if hasattr(uploaded_file, 'read'):
-                df = pd.read_csv(uploaded_file)
-                df.to_csv(filepath, index=False)
-            else:
-                # If it's already a dataframe
-                uploaded_file.to_csv(filepath, index=False)
-            
+            self._record_upload(content_hash, filename)
             logging.info(f"New data stored: {filepath}")
             return filepath
             
         except Exception as e:
             logging.error(f"Error storing new data: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
             raise
+        finally:
+            if isinstance(data, memoryview):
+                # An exported buffer would block the caller from resizing the upload
+                data.release()
+    
+    def _load_upload_index(self):
+        try:
+            with open(self.upload_index_path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+    
+    def _find_staged_upload(self, content_hash):
+        """
+        Path of an already staged or archived upload with this content hash
+        
+        Returns:
+            str: Existing file path, or None if the content is new
+        """
+        entry = self._load_upload_index().get(content_hash)
+        if entry is None:
+            return None
+        for directory in [self.new_data_dir, self.archive_dir]:
+            path = os.path.join(directory, entry['file'])
+            if os.path.exists(path):
+                return path
+        # Indexed file was removed; treat the upload as new
+        return None
+    
+    def _record_upload(self, content_hash, filename):
+        """Add an upload to the hash index (written atomically)"""
+        index = self._load_upload_index()
+        index[content_hash] = {
+            'file': filename,
+            'stored': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        tmp_path = self.upload_index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, self.upload_index_path)
     
     def get_new_files(self):
         """
@@ -81,12 +192,23 @@ class DataManager:
             logging.error(f"Error getting new files: {str(e)}")
             return []
     
-    def merge_and_clean_data(self):
+    def merge_and_clean_data(self, load=True):
         """
         Merge new data with master dataset, clean and deduplicate
         
+        New rows are appended to the master as a delta segment instead of
+        rewriting it, so the merge costs O(new data). The base file stays
+        cleaned and sorted by customer_id; reading the master only dedupes
+        the (small) segments, drops the base rows they replace and then the
+        rows missing critical values, the same result as cleaning the whole
+        history on every merge. Segments are compacted into the base file
+        once there are more than max_delta_segments of them.
+        
+        Args:
+            load: Return the updated master dataset (reads all of it)
+        
         Returns:
-            pd.DataFrame: Updated master dataset
+            pd.DataFrame: Updated master dataset (None if load is False)
         """
         try:
             # Get new files
@@ -94,53 +216,178 @@ class DataManager:
             
             if not new_files:
                 logging.info("No new files to process")
-                return self.get_training_data()
+                return self.get_training_data() if load else None
             
             logging.info(f"Processing {len(new_files)} new files")
             
-            # Load existing master dataset
-            if os.path.exists(self.master_dataset_path):
-                master_df = pd.read_csv(self.master_dataset_path)
-                logging.info(f"Loaded master dataset: {len(master_df)} rows")
+            # Merge new files
+            new_data_frames = self._read_staged_files(new_files)
+            new_df = pd.concat(new_data_frames, ignore_index=True)
+            self.last_merged_ids = new_df['customer_id'].dropna().unique()
+            
+            storage = None
+            master_df = None
+            if self._master_exists():
+                # Upsert: append as the newest segment
+                storage = self._storage_signature()
+                segment_path = self._write_delta_segment(new_df)
+                logging.info(f"Appended {len(new_df)} rows to master as {os.path.basename(segment_path)}")
+                
+                if len(self._get_delta_segments()) > self.max_delta_segments:
+                    # Compaction reads the master anyway and rebuilds the manifest
+                    self.compact_master()
+                    storage = None
             else:
-                master_df = pd.DataFrame()
                 logging.info("No existing master dataset, creating new one")
+                master_df = self._clean_data(new_df)
+                self._write_master(master_df)
             
-            # Merge new files
-            new_data_frames = []
-            for filepath in new_files:
-                df = pd.read_csv(filepath)
-                new_data_frames.append(df)
-                logging.info(f"Loaded {filepath}: {len(df)} rows")
-            
-            # Combine all new data
-            if new_data_frames:
-                new_df = pd.concat(new_data_frames, ignore_index=True)
-                
-                # Combine with master
-                if not master_df.empty:
-                    combined_df = pd.concat([master_df, new_df], ignore_index=True)
-                else:
-                    combined_df = new_df
-                
-                # Clean and deduplicate
-                combined_df = self._clean_data(combined_df)
-                
-                # Save updated master dataset
-                combined_df.to_csv(self.master_dataset_path, index=False)
-                logging.info(f"Updated master dataset: {len(combined_df)} rows")
-                
-                # Archive processed files
-                self._archive_processed_files(new_files)
-                
-                return combined_df
+            # Archive processed files
+            self._archive_processed_files(new_files)
             
-            return master_df
+            if not load:
+                # Keep the manifest current without reading the whole master
+                if storage is not None:
+                    self._merge_manifest(storage, new_df)
+                elif master_df is not None:
+                    self._update_manifest(master_df)
+                return None
+            
+            combined_df = self._read_master()
+            self._update_manifest(combined_df)
+            logging.info(f"Updated master dataset: {len(combined_df)} rows")
+            return combined_df
             
         except Exception as e:
             logging.error(f"Error merging data: {str(e)}")
             raise
     
+    def _read_staged_file(self, filepath):
+        """
+        Parse one staged upload with the compact MASTER_DTYPES schema
+        
+        Returns:
+            tuple: (DataFrame, per-file report dict)
+        """
+        start = time.perf_counter()
+        header = pd.read_csv(filepath, nrows=0).columns
+        dtype = {col: MASTER_DTYPES[col] for col in header if col in MASTER_DTYPES}
+        try:
+            df = pd.read_csv(filepath, dtype=dtype)
+        except (ValueError, TypeError):
+            # Non-numeric junk in a numeric column: parse untyped, then coerce
+            df = self._apply_schema(pd.read_csv(filepath))
+        parse_seconds = time.perf_counter() - start
+        
+        report = {
+            'file': os.path.basename(filepath),
+            'rows': len(df),
+            'parse_seconds': parse_seconds,
+            'memory_bytes': int(df.memory_usage(deep=True, index=False).sum()),
+            'untyped_memory_bytes': self._estimate_untyped_memory(df)
+        }
+        return df, report
+    
+    def _estimate_untyped_memory(self, df):
+        """
+        Memory the same frame takes with pandas' default inference
+        (int64/float64 numbers), without re-parsing the file
+        """
+        total = 0
+        for col in df.columns:
+            if pd.api.types.is_numeric_dtype(df[col]):
+                total += 8 * len(df)
+            else:
+                total += int(df[col].memory_usage(deep=True, index=False))
+        return total
+    
+    def _read_staged_files(self, files):
+        """
+        Parse staged uploads concurrently
+        
+        Records per-file parse time and the memory saved versus untyped
+        parsing in self.last_ingest_report.
+        
+        Args:
+            files: Staged CSV paths, in merge order
+            
+        Returns:
+            list: DataFrames in the same order as files
+        """
+        start = time.perf_counter()
+        workers = max(1, min(self.ingest_workers, len(files)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(self._read_staged_file, files))
+        
+        frames = [df for df, _ in results]
+        file_reports = [report for _, report in results]
+        for report in file_reports:
+            logging.info(f"Loaded {report['file']}: {report['rows']} rows "
+                         f"in {report['parse_seconds']:.2f}s")
+        
+        memory = sum(r['memory_bytes'] for r in file_reports)
+        untyped = sum(r['untyped_memory_bytes'] for r in file_reports)
+        self.last_ingest_report = {
+            'files': file_reports,
+            'workers': workers,
+            'wall_seconds': time.perf_counter() - start,
+            'memory_bytes': memory,
+            'memory_saved_bytes': untyped - memory
+        }
+        logging.info(f"Ingested {len(files)} files with {workers} workers: "
+                     f"{memory / 1e6:.1f} MB ({(untyped - memory) / 1e6:.1f} MB saved by typed parsing)")
+        return frames
+    
+    def compact_master(self):
+        """
+        Fold all delta segments into the base master file
+        
+        Returns:
+            pd.DataFrame: Compacted master dataset
+        """
+        segments = self._get_delta_segments()
+        # Restores the clean base that _read_master relies on
+        df = self._write_master(self._clean_data(self._read_master()))
+        for segment in segments:
+            os.remove(segment)
+        self._update_manifest(df)
+        logging.info(f"Compacted {len(segments)} delta segments into master: {len(df)} rows")
+        return df
+    
+    def _get_delta_segments(self):
+        """Delta segment paths, oldest first"""
+        if not os.path.isdir(self.delta_dir):
+            return []
+        return sorted(
+            os.path.join(self.delta_dir, f)
+            for f in os.listdir(self.delta_dir)
+            if f.startswith('delta_') and f.endswith(('.parquet', '.csv'))
+        )
+    
+    def _write_delta_segment(self, df):
+        """
+        Write new rows as the next numbered delta segment
+        
+        Rows are only deduplicated (keep last per customer_id). Rows missing
+        a critical value are kept until the master is read: like any newer
+        row they replace the customer's earlier row, and are then dropped.
+        """
+        os.makedirs(self.delta_dir, exist_ok=True)
+        segments = self._get_delta_segments()
+        seq = int(os.path.basename(segments[-1]).split('_')[1].split('.')[0]) + 1 if segments else 1
+        
+        df = self._apply_schema(df.drop_duplicates(subset=['customer_id'], keep='last'))
+        ext = '.parquet' if PARQUET_AVAILABLE else '.csv'
+        path = os.path.join(self.delta_dir, f"delta_{seq:06d}{ext}")
+        tmp_path = path + '.tmp'
+        if PARQUET_AVAILABLE:
+            df.to_parquet(tmp_path, index=False, compression='zstd')
+        else:
+            df.to_csv(tmp_path, index=False)
+        # Readers never see a partially written segment
+        os.replace(tmp_path, path)
+        return path
+    
     def _clean_data(self, df):
         """
         Clean and deduplicate data
@@ -160,8 +407,7 @@ class DataManager:
             logging.info(f"Removed {removed} duplicate rows")
         
         # Remove rows with missing critical values
-        critical_columns = ['customer_id', 'credit_limit', 'utilisation_pct']
-        df = df.dropna(subset=critical_columns)
+        df = df.dropna(subset=self.critical_columns)
         
         # Sort by customer_id
         df = df.sort_values('customer_id').reset_index(drop=True)
@@ -184,16 +430,135 @@ class DataManager:
         except Exception as e:
             logging.error(f"Error archiving files: {str(e)}")
     
-    def get_training_data(self):
+    def _master_exists(self):
+        return (PARQUET_AVAILABLE and os.path.exists(self.master_parquet_path)) \
+            or os.path.exists(self.master_dataset_path)
+    
+    def _master_path(self):
+        """Path of the file currently holding the master dataset"""
+        if PARQUET_AVAILABLE and os.path.exists(self.master_parquet_path):
+            return self.master_parquet_path
+        return self.master_dataset_path
+    
+    def _apply_schema(self, df):
+        """Cast known columns to the compact MASTER_DTYPES"""
+        for col, dtype in MASTER_DTYPES.items():
+            if col not in df.columns:
+                continue
+            if dtype == 'string':
+                df[col] = df[col].astype('string')
+            else:
+                df[col] = pd.to_numeric(df[col], errors='coerce').astype(dtype)
+        return df
+    
+    def _read_frame(self, path, columns=None):
+        if path.endswith('.parquet'):
+            return pd.read_parquet(path, columns=columns)
+        return self._apply_schema(pd.read_csv(path, usecols=columns))
+    
+    def _read_master(self, columns=None):
+        """
+        Read the master dataset, optionally only some columns
+        
+        Parquet is columnar, so unrequested columns are never parsed.
+        A legacy CSV master is read (and typed) until the next merge
+        rewrites it as Parquet. Pending delta segments are applied on top
+        of the base file.
+        
+        Only the segments are deduplicated. The base is already clean, so
+        the rows the segments replace are dropped with one membership test
+        against the segments' customer_ids instead of re-cleaning the whole
+        history. Replacement happens before rows missing critical values are
+        dropped, so a newer incomplete row still removes the customer, as
+        the full clean did. Rows come back sorted by customer_id.
+        """
+        segments = self._get_delta_segments()
+        if not segments:
+            return self._read_frame(self._master_path(), columns)
+        
+        # Deduplication needs the key and critical columns
+        read_columns = None
+        if columns is not None:
+            read_columns = list(dict.fromkeys(list(columns) + self.critical_columns))
+        
+        recent = self._latest_segment_rows(segments, read_columns)
+        base = self._read_frame(self._master_path(), read_columns)
+        base = base[~self._replaced_rows(base['customer_id'], recent['customer_id'].dropna())]
+        df = pd.concat([base, self._clean_data(recent)], ignore_index=True)
+        # Both parts are sorted; restore the master's customer_id order
+        df = df.sort_values('customer_id').reset_index(drop=True)
+        return df[list(columns)] if columns is not None else df
+    
+    def _latest_segment_rows(self, segments, columns=None):
+        """Newest row per customer_id across segments, before dropping incomplete rows"""
+        return pd.concat(
+            [self._read_frame(segment, columns) for segment in segments], ignore_index=True
+        ).drop_duplicates(subset=['customer_id'], keep='last')
+    
+    def _replaced_rows(self, base_ids, ids):
+        """
+        Boolean mask of base rows whose customer_id is in ids
+        
+        Only ids (the small segment side) is hashed; with pyarrow the base
+        keys are probed in Arrow without converting them to Python strings.
+        """
+        if PARQUET_AVAILABLE:
+            mask = pyarrow.compute.is_in(
+                pyarrow.array(base_ids.array), value_set=pyarrow.array(ids.array)
+            )
+            return mask.to_numpy(zero_copy_only=False)
+        return base_ids.isin(ids).to_numpy()
+    
+    def _write_master(self, df):
+        """
+        Write the master dataset with typed columns
+        
+        Returns:
+            pd.DataFrame: The typed frame that was written
+        """
+        df = self._apply_schema(df)
+        if PARQUET_AVAILABLE:
+            tmp_path = self.master_parquet_path + '.tmp'
+            df.to_parquet(tmp_path, index=False, compression='zstd')
+            os.replace(tmp_path, self.master_parquet_path)
+            if os.path.exists(self.master_dataset_path):
+                # Legacy CSV is now stale; export_master_csv recreates it on demand
+                os.remove(self.master_dataset_path)
+                logging.info("Migrated master dataset from CSV to Parquet")
+        else:
+            df.to_csv(self.master_dataset_path, index=False)
+        return df
+    
+    def export_master_csv(self, path=None):
+        """
+        Export the master dataset as CSV for tools that need it
+        
+        Args:
+            path: Destination (default: data/training/master_dataset.csv)
+            
+        Returns:
+            str: Path written
+        """
+        path = path or self.master_dataset_path
+        if self._master_path() == path:
+            return path
+        self._read_master().to_csv(path, index=False)
+        logging.info(f"Exported master dataset to {path}")
+        return path
+    
+    def get_training_data(self, columns=None):
         """
         Load master training dataset
         
+        Args:
+            columns: Optional list of columns to load (e.g. features + target)
+        
         Returns:
             pd.DataFrame: Training data
         """
         try:
-            if os.path.exists(self.master_dataset_path):
-                df = pd.read_csv(self.master_dataset_path)
+            if self._master_exists():
+                df = self._read_master(columns)
                 logging.info(f"Loaded training data: {len(df)} rows")
                 return df
             else:
@@ -201,10 +566,11 @@ class DataManager:
                 sample_path = 'data/sample_data.csv'
                 if os.path.exists(sample_path):
                     df = pd.read_csv(sample_path)
-                    # Save as master
-                    df.to_csv(self.master_dataset_path, index=False)
+                    # Save as master (the base is always kept clean)
+                    df = self._write_master(self._clean_data(df))
+                    self._update_manifest(df)
                     logging.info(f"Initialized master dataset from sample: {len(df)} rows")
-                    return df
+                    return df[columns] if columns is not None else df
                 else:
                     logging.error("No training data available")
                     return pd.DataFrame()
@@ -212,25 +578,236 @@ class DataManager:
             logging.error(f"Error loading training data: {str(e)}")
             raise
     
-    def get_data_stats(self):
+    def get_storage_signature(self):
         """
-        Get statistics about current data
+        Identity of the stored master (base file plus delta segments)
         
         Returns:
-            dict: Data statistics
+            list: [name, mtime_ns, size] per file; changes whenever the master does
         """
-        stats = {
+        return self._storage_signature()
+    
+    def get_rows_since(self, signature):
+        """
+        Rows merged into the master since it had the given storage signature
+        
+        Only the delta segments written since then are read, so a caller that
+        keeps its own copy of the master (the FeatureStore) can catch up
+        without re-reading the history.
+        
+        Args:
+            signature: Earlier get_storage_signature() result
+        
+        Returns:
+            tuple: (rows, replaced_ids). rows are the cleaned rows of the new
+                segments, one per customer_id. replaced_ids are every
+                customer_id they replace, including customers whose newest
+                row was dropped for a missing critical value. Both are empty
+                if nothing changed. None if the base file or an earlier
+                segment changed since (e.g. compaction), so the master has
+                to be read in full.
+        """
+        current = self._storage_signature()
+        if not signature or current[:len(signature)] != signature:
+            return None
+        known = {entry[0] for entry in signature}
+        segments = [
+            path for path in self._get_delta_segments() if os.path.basename(path) not in known
+        ]
+        if not segments:
+            empty = self._apply_schema(pd.DataFrame(columns=list(MASTER_DTYPES)))
+            return empty, empty['customer_id']
+        recent = self._latest_segment_rows(segments)
+        return self._clean_data(recent), recent['customer_id'].dropna()
+    
+    def _storage_signature(self):
+        """(name, mtime_ns, size) of the base file and every delta segment"""
+        paths = [self._master_path()] + self._get_delta_segments()
+        signature = []
+        for path in paths:
+            if os.path.exists(path):
+                stat = os.stat(path)
+                signature.append([os.path.basename(path), stat.st_mtime_ns, stat.st_size])
+        return signature
+    
+    def _directory_signature(self):
+        """mtime of the staging and archive directories (changes on add/remove)"""
+        return {
+            name: os.stat(path).st_mtime_ns if os.path.isdir(path) else None
+            for name, path in [('new', self.new_data_dir), ('archive', self.archive_dir)]
+        }
+    
+    def _count_staged_files(self):
+        return {
             'new_files': len(self.get_new_files()),
-            'archived_files': len([f for f in os.listdir(self.archive_dir) if f.endswith('.csv')]),
-            'training_rows': 0,
-            'last_update': None
+            'archived_files': len([f for f in os.listdir(self.archive_dir) if f.endswith('.csv')])
         }
+    
+    def _summarize_columns(self, df):
+        """Per-column null counts and numeric ranges"""
+        summary = {}
+        for col in df.columns:
+            col_summary = {'nulls': int(df[col].isna().sum())}
+            if pd.api.types.is_numeric_dtype(df[col]) and df[col].notna().any():
+                col_summary.update({
+                    'min': float(df[col].min()),
+                    'max': float(df[col].max()),
+                    'mean': float(df[col].mean())
+                })
+            else:
+                col_summary['unique'] = int(df[col].nunique())
+            summary[col] = col_summary
+        return summary
+    
+    def _write_manifest(self, manifest):
+        """Write the manifest atomically (temp file + rename)"""
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+    
+    def _update_manifest(self, df):
+        """
+        Record row count, schema, column summaries and file lists for the
+        master dataset currently on disk
         
-        if os.path.exists(self.master_dataset_path):
-            df = pd.read_csv(self.master_dataset_path)
-            stats['training_rows'] = len(df)
-            stats['last_update'] = datetime.fromtimestamp(
-                os.path.getmtime(self.master_dataset_path)
-            ).strftime('%Y-%m-%d %H:%M:%S')
+        Args:
+            df: The full, cleaned master dataset
+        """
+        try:
+            manifest = {
+                'row_count': len(df),
+                'schema': {col: str(dtype) for col, dtype in df.dtypes.items()},
+                'columns': self._summarize_columns(df),
+                'storage': self._storage_signature(),
+                'directories': self._directory_signature(),
+                'last_update': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
+            manifest.update(self._count_staged_files())
+            self._write_manifest(manifest)
+            return manifest
+        except Exception as e:
+            logging.error(f"Error updating manifest: {str(e)}")
+            return None
+    
+    def _merge_manifest(self, storage, new_df):
+        """
+        Fold a merged delta into the manifest without reading the master
+        
+        The row count is exact (only the customer_id and critical columns
+        are read). Column summaries are combined from the delta's: nulls
+        and means are weighted by row counts and ranges widened. Values of
+        the rows the delta replaced are not subtracted, so these summaries
+        are approximate until the next compaction rebuilds the manifest.
+        
+        Args:
+            storage: Storage signature of the master before the merge
+            new_df: Raw rows of the merge
         
-        return stats
+        Returns:
+            dict: Updated manifest, or None if the manifest did not describe
+                the master before the merge (it is rebuilt on next read)
+        """
+        try:
+            manifest = self._load_manifest()
+            if manifest is None or manifest.get('storage') != storage:
+                return None
+            
+            rows = self._clean_data(self._apply_schema(new_df))
+            added = self._summarize_columns(rows)
+            old_count = manifest['row_count']
+            row_count = len(self._read_master(columns=['customer_id']))
+            
+            columns = manifest['columns']
+            for col, new in added.items():
+                old = columns.get(col)
+                if old is None:
+                    columns[col] = new
+                    continue
+                merged = {'nulls': old['nulls'] + new['nulls']}
+                if 'mean' in old and 'mean' in new:
+                    old_values = old_count - old['nulls']
+                    new_values = len(rows) - new['nulls']
+                    merged.update({
+                        'min': min(old['min'], new['min']),
+                        'max': max(old['max'], new['max']),
+                        'mean': (old['mean'] * old_values + new['mean'] * new_values)
+                        / (old_values + new_values)
+                    })
+                else:
+                    # One side has no numeric values (e.g. an all-null column)
+                    values = old if 'mean' in old else new
+                    merged.update({key: values[key] for key in ('min', 'max', 'mean', 'unique') if key in values})
+                columns[col] = merged
+            # customer_id is unique in the clean master
+            columns['customer_id'] = {'nulls': 0, 'unique': row_count}
+            
+            manifest.update({
+                'row_count': row_count,
+                'columns': columns,
+                'storage': self._storage_signature(),
+                'directories': self._directory_signature(),
+                'last_update': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            })
+            manifest.update(self._count_staged_files())
+            self._write_manifest(manifest)
+            return manifest
+        except Exception as e:
+            logging.error(f"Error updating manifest: {str(e)}")
+            return None
+    
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+    
+    def get_manifest(self):
+        """
+        Get the dataset manifest, rebuilding whatever part of it is stale
+        
+        The master files and the staging/archive directories are only
+        stat-ed; the data is re-read only if the master changed without the
+        manifest being updated.
+        
+        Returns:
+            dict: Manifest, or None if there is no master dataset
+        """
+        if not self._master_exists():
+            return None
+        
+        manifest = self._load_manifest()
+        if manifest is None or manifest.get('storage') != self._storage_signature():
+            logging.info("Dataset manifest missing or stale, rebuilding")
+            return self._update_manifest(self._read_master())
+        
+        directories = self._directory_signature()
+        if manifest.get('directories') != directories:
+            manifest.update(self._count_staged_files())
+            manifest['directories'] = directories
+            self._write_manifest(manifest)
+        
+        return manifest
+    
+    def get_data_stats(self):
+        """
+        Get statistics about current data
+        
+        Served from the dataset manifest, so the master is not read.
+        
+        Returns:
+            dict: Data statistics
+        """
+        manifest = self.get_manifest()
+        if manifest is None:
+            stats = self._count_staged_files()
+            stats.update({'training_rows': 0, 'last_update': None})
+            return stats
+        
+        return {
+            'new_files': manifest['new_files'],
+            'archived_files': manifest['archived_files'],
+            'training_rows': manifest['row_count'],
+            'last_update': manifest['last_update']
+        }
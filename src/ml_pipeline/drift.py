@@ -0,0 +1,83 @@
+"""
+Drift Module
+Reference profiles (quantile histograms of features and scores) and their
+PSI / Kolmogorov-Smirnov comparison with new data. The statistics live in
+utils.drift_stats so that scoring processes can use them too.
+"""
+
+import numpy as np
+
+from utils.drift_stats import (
+    N_BINS, PSI_MAJOR, PSI_MODERATE, bin_counts, ks, load_profile, psi, quantile_edges, save_profile
+)
+
+PROFILE_SAMPLE_ROWS = 200000
+
+def build_reference_profile(X, scores, feature_columns, n_bins=N_BINS, random_state=42):
+    """
+    Quantile histograms of each feature and of the model's scores
+
+    Args:
+        X: Reference feature matrix (columns in feature_columns order)
+        scores: Model probabilities for the rows of X
+        feature_columns: Feature names
+        n_bins: Bins per histogram
+        random_state: Seed for sampling large references
+
+    Returns:
+        dict: JSON-serializable profile
+    """
+    X = np.asarray(X)
+    scores = np.asarray(scores)
+    if len(X) > PROFILE_SAMPLE_ROWS:
+        rows = np.sort(np.random.default_rng(random_state).choice(len(X), PROFILE_SAMPLE_ROWS, replace=False))
+        X, scores = X[rows], scores[rows]
+
+    def histogram(values):
+        edges = quantile_edges(values, n_bins)
+        return {'edges': edges, 'counts': bin_counts(values, edges).tolist()}
+
+    return {
+        'rows': int(len(X)),
+        'features': {col: histogram(X[:, j]) for j, col in enumerate(feature_columns)},
+        'score': histogram(scores)
+    }
+
+def compare_to_reference(profile, X, scores=None):
+    """
+    PSI and KS of new data against a reference profile
+
+    Each column is binned once with the stored edges; the reference data is
+    never touched again.
+
+    Args:
+        profile: Output of build_reference_profile
+        X: DataFrame with the profile's feature columns, or an array with
+            columns in the profile's order
+        scores: Optional model probabilities for the rows of X
+
+    Returns:
+        dict: per-feature and score psi/ks, max_feature_psi, drifted_features
+    """
+    features = {}
+    for j, (col, reference) in enumerate(profile['features'].items()):
+        values = X[col].to_numpy() if hasattr(X, 'columns') else np.asarray(X)[:, j]
+        counts = bin_counts(values, reference['edges'])
+        features[col] = {
+            'psi': psi(reference['counts'], counts),
+            'ks': ks(reference['counts'], counts)
+        }
+
+    result = {
+        'features': features,
+        'max_feature_psi': max((f['psi'] for f in features.values()), default=0.0),
+        'drifted_features': [col for col, f in features.items() if f['psi'] > PSI_MAJOR]
+    }
+    if scores is not None:
+        reference = profile['score']
+        counts = bin_counts(scores, reference['edges'])
+        result['score'] = {
+            'psi': psi(reference['counts'], counts),
+            'ks': ks(reference['counts'], counts)
+        }
+    return result
@@ -0,0 +1,323 @@
+"""
+Feature Store Module
+Persists the master dataset's feature matrix and labels as memory-mapped
+float32/int8 arrays shared by training, validation and drift checks.
+
+Each build or update writes a new version directory (X.npy, y.npy, ids.npy,
+meta.json, later split.npz) and then atomically swaps current.json to point
+at it, so readers never see arrays from different versions and no file that
+may be memory-mapped is overwritten.
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime
+import logging
+
+import numpy as np
+
+logging.basicConfig(
+    filename='logs/retraining.log',
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+class FeatureStore:
+    def __init__(self, store_dir='data/training/features'):
+        self.store_dir = store_dir
+        self.pointer_path = os.path.join(store_dir, 'current.json')
+
+    @property
+    def features_path(self):
+        return self._path('X.npy')
+
+    @property
+    def labels_path(self):
+        return self._path('y.npy')
+
+    @property
+    def ids_path(self):
+        return self._path('ids.npy')
+
+    @property
+    def meta_path(self):
+        return self._path('meta.json')
+
+    @property
+    def split_path(self):
+        return self._path('split.npz')
+
+    def _current_dir(self):
+        """Version directory current.json points at, or None"""
+        try:
+            with open(self.pointer_path, 'r') as f:
+                return os.path.join(self.store_dir, json.load(f)['version'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _path(self, filename, version_dir=None):
+        """Path of filename in version_dir (default: the current version)"""
+        version_dir = version_dir or self._current_dir()
+        if version_dir is None:
+            # No store yet: a path that does not exist
+            return os.path.join(self.store_dir, 'missing', filename)
+        return os.path.join(version_dir, filename)
+
+    def _new_version_dir(self):
+        version_dir = os.path.join(self.store_dir, 'v_' + datetime.now().strftime('%Y%m%d_%H%M%S_%f'))
+        os.makedirs(version_dir)
+        return version_dir
+
+    def _activate(self, version_dir):
+        """
+        Point current.json at a fully written version, then drop the others
+
+        Best effort: a version still memory-mapped by a reader (Windows) is
+        left for the next swap.
+        """
+        tmp_path = self.pointer_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': os.path.basename(version_dir)}, f)
+        os.replace(tmp_path, self.pointer_path)
+
+        for name in os.listdir(self.store_dir):
+            path = os.path.join(self.store_dir, name)
+            if path == self.pointer_path or name == os.path.basename(version_dir):
+                continue
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                # Arrays of the unversioned layout
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def build(self, df, feature_columns, target_column, source_signature=None,
+              id_column='customer_id'):
+        """
+        Write the feature matrix and binary labels of df to disk
+
+        The matrix is a C-contiguous float32 .npy file (the dtype sklearn
+        trees train on), filled column by column so no second in-memory
+        copy of the features is made. The row ids are kept too, so later
+        merges can be applied with update() instead of a rebuild.
+
+        Args:
+            df: Master dataset
+            feature_columns: Feature column order
+            target_column: Target column (label = target > 0)
+            source_signature: Optional identity of the data df came from
+            id_column: Row key column
+
+        Returns:
+            tuple: (X, y) read-only memory maps
+        """
+        os.makedirs(self.store_dir, exist_ok=True)
+        n_rows = len(df)
+        version_dir = self._new_version_dir()
+
+        X = np.lib.format.open_memmap(
+            self._path('X.npy', version_dir), mode='w+', dtype=np.float32,
+            shape=(n_rows, len(feature_columns))
+        )
+        for j, col in enumerate(feature_columns):
+            X[:, j] = df[col].to_numpy(dtype=np.float32, na_value=np.nan)
+        X.flush()
+        del X
+
+        y = (df[target_column] > 0).to_numpy(dtype=np.int8)
+        np.save(self._path('y.npy', version_dir), y)
+        ids = df[id_column].to_numpy(dtype=str) if id_column in df.columns else None
+        if ids is not None:
+            np.save(self._path('ids.npy', version_dir), ids)
+
+        self._write_meta(version_dir, n_rows, feature_columns, target_column, source_signature,
+                         id_column, ids, refresh='build')
+        self._activate(version_dir)
+
+        logging.info(f"Feature store built: {n_rows} rows x {len(feature_columns)} features")
+        return self.load()
+
+    def update(self, df, source_signature, replaced_ids=None, chunk_rows=1000000):
+        """
+        Apply newly merged rows to the stored arrays
+
+        Stored rows whose id appears in replaced_ids (by default df's ids)
+        are dropped and df's rows are appended, the same "keep last per id"
+        result as rebuilding from the merged master. Only df is converted;
+        the stored rows are copied between memory maps in chunks.
+
+        Args:
+            df: Cleaned rows merged since the store was built (one per id)
+            source_signature: Identity of the master after the merge
+            replaced_ids: Ids whose stored rows are superseded; may include
+                ids with no row in df (their newest row was dropped)
+            chunk_rows: Stored rows copied per step
+
+        Returns:
+            tuple: (X, y) read-only memory maps; df's rows are the last len(df)
+        """
+        current_dir = self._current_dir()
+        meta = self.get_meta()
+        feature_columns, target_column = meta['feature_columns'], meta['target_column']
+        id_column = meta['id_column']
+        if replaced_ids is None:
+            replaced_ids = df[id_column]
+        if len(replaced_ids) == 0:
+            # Same rows: keep the arrays (and their split) as they are
+            meta['source_signature'] = source_signature
+            meta['refresh'] = 'unchanged'
+            self._save_meta(current_dir, meta)
+            return self._load(current_dir)
+        X_old, y_old = self._load(current_dir)
+        ids_old = np.load(self._path('ids.npy', current_dir))
+        version_dir = self._new_version_dir()
+        new_ids = df[id_column].to_numpy(dtype=str)
+        keep = ~np.isin(ids_old, np.asarray(replaced_ids, dtype=str))
+        n_kept = int(keep.sum())
+        n_rows = n_kept + len(df)
+
+        X = np.lib.format.open_memmap(
+            self._path('X.npy', version_dir), mode='w+', dtype=np.float32,
+            shape=(n_rows, len(feature_columns))
+        )
+        position = 0
+        for start in range(0, len(keep), chunk_rows):
+            rows = X_old[start:start + chunk_rows][keep[start:start + chunk_rows]]
+            X[position:position + len(rows)] = rows
+            position += len(rows)
+        for j, col in enumerate(feature_columns):
+            X[n_kept:, j] = df[col].to_numpy(dtype=np.float32, na_value=np.nan)
+        X.flush()
+        del X, X_old
+
+        y = np.concatenate([y_old[keep], (df[target_column] > 0).to_numpy(dtype=np.int8)])
+        np.save(self._path('y.npy', version_dir), y)
+        ids = np.concatenate([ids_old[keep], new_ids])
+        np.save(self._path('ids.npy', version_dir), ids)
+        # Release the old version's maps so it can be removed
+        del y_old
+
+        self._write_meta(version_dir, n_rows, feature_columns, target_column, source_signature,
+                         id_column, ids, refresh='update')
+        self._activate(version_dir)
+
+        logging.info(
+            f"Feature store updated: {len(keep) - n_kept} rows replaced, "
+            f"{len(df)} rows written, {n_rows} rows total"
+        )
+        return self.load()
+
+    def _write_meta(self, version_dir, n_rows, feature_columns, target_column, source_signature,
+                    id_column, ids, refresh):
+        meta = {
+            'rows': n_rows,
+            'feature_columns': list(feature_columns),
+            'target_column': target_column,
+            'id_column': id_column if ids is not None else None,
+            'source_signature': source_signature,
+            'refresh': refresh,
+            'built': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        self._save_meta(version_dir, meta)
+
+    def _save_meta(self, version_dir, meta):
+        """Write meta.json atomically (temp file + rename)"""
+        path = self._path('meta.json', version_dir)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def load(self):
+        """
+        Open the stored arrays without reading them into memory
+
+        Every process that opens them shares the same page-cache pages.
+
+        Returns:
+            tuple: (X, y) read-only memory maps of the same version
+        """
+        return self._load(self._current_dir())
+
+    def _load(self, version_dir):
+        X = np.load(self._path('X.npy', version_dir), mmap_mode='r')
+        y = np.load(self._path('y.npy', version_dir), mmap_mode='r')
+        return X, y
+
+    def get_meta(self):
+        try:
+            with open(self.meta_path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def load_ids(self):
+        """
+        Returns:
+            np.ndarray: Row ids in row order, or None if the store has none
+        """
+        if not os.path.exists(self.ids_path):
+            return None
+        return np.load(self.ids_path)
+
+    def get_source_signature(self, feature_columns, target_column):
+        """
+        Identity of the data the stored arrays were built from
+
+        Args:
+            feature_columns: Feature column order the caller needs
+            target_column: Target column the caller needs
+
+        Returns:
+            list: The source_signature passed to build/update, or None if
+                the store is missing, has other columns or cannot be
+                updated (no row ids)
+        """
+        version_dir = self._current_dir()
+        meta = self.get_meta()
+        if (
+            meta is None
+            or meta.get('feature_columns') != list(feature_columns)
+            or meta.get('target_column') != target_column
+            or not meta.get('id_column')
+            or not all(os.path.exists(self._path(name, version_dir))
+                       for name in ('X.npy', 'y.npy', 'ids.npy'))
+        ):
+            return None
+        return meta.get('source_signature')
+
+    def save_split(self, train_idx, test_idx):
+        """Persist the trainer's split so validation and drift checks reuse it"""
+        np.savez(self.split_path, train=train_idx, test=test_idx)
+
+    def load_split(self):
+        """
+        Returns:
+            tuple: (train_idx, test_idx), or None if no split is stored
+        """
+        return self._load_split(self._current_dir())
+
+    def _load_split(self, version_dir):
+        path = self._path('split.npz', version_dir)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as split:
+            return split['train'], split['test']
+
+    def load_test_set(self):
+        """
+        Read only the held-out rows of the stored split
+
+        Returns:
+            tuple: (X_test, y_test) arrays, or None if no split is stored
+        """
+        version_dir = self._current_dir()
+        split = self._load_split(version_dir)
+        if split is None:
+            return None
+        X, y = self._load(version_dir)
+        test_idx = split[1]
+        return X[test_idx], y[test_idx]
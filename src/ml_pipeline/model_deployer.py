@@ -10,6 +10,9 @@ import os
 from datetime import datetime
 import logging
 
+from utils.compiled_forest import MANIFEST_FILENAME, CompiledForest, compiled_path
+from utils.model_registry import file_hash
+
 logging.basicConfig(
     filename='logs/retraining.log',
     level=logging.INFO,
@@ -23,6 +26,8 @@ class ModelDeployer:
         self.metadata_dir = 'models/metadata'
         self.active_model_path = os.path.join(self.active_dir, 'model.pkl')
         self.active_metadata_path = os.path.join(self.active_dir, 'metadata.json')
+        self.active_compiled_dir = os.path.join(self.active_dir, 'compiled')
+        self.active_profile_path = os.path.join(self.active_dir, 'reference_profile.json')
         self.deployment_log_path = 'logs/deployments.json'
         
     def deploy_model(self, version):
@@ -56,6 +61,18 @@ class ModelDeployer:
             # Copy new model to active directory
             shutil.copy2(model_path, self.active_model_path)
             
+            # Export array-based predictor for low-latency scoring
+            self._export_compiled_model(version)
+            
+            # Install the reference histograms used by drift checks
+            profile_path = os.path.join(
+                self.versions_dir, f"model_v{version.replace('.', '_')}_profile.json"
+            )
+            if os.path.exists(profile_path):
+                shutil.copy2(profile_path, self.active_profile_path)
+            elif os.path.exists(self.active_profile_path):
+                os.remove(self.active_profile_path)
+            
             # Update metadata
             with open(metadata_path, 'r') as f:
                 metadata = json.load(f)
@@ -115,6 +132,64 @@ class ModelDeployer:
             logging.error(f"Error rolling back model: {str(e)}")
             return False
     
+    def _export_compiled_model(self, version):
+        """
+        Put the active model's flat node arrays in active/compiled/<hash>/
+        
+        The version's saved flat model is copied when it matches the pickle;
+        otherwise the forest is compiled from model.pkl. Models that cannot
+        be compiled (non-forest estimators) simply have no compiled form;
+        scoring then uses the pickled model.
+        """
+        try:
+            source_hash = file_hash(self.active_model_path)
+            target = compiled_path(self.active_compiled_dir, source_hash)
+            
+            if not os.path.exists(os.path.join(target, MANIFEST_FILENAME)):
+                os.makedirs(self.active_compiled_dir, exist_ok=True)
+                version_flat = os.path.join(
+                    self.versions_dir, f"model_v{version.replace('.', '_')}_compiled"
+                )
+                if self._flat_model_matches(version_flat, source_hash):
+                    tmp_target = f"{target}.tmp{os.getpid()}"
+                    shutil.rmtree(tmp_target, ignore_errors=True)
+                    shutil.copytree(version_flat, tmp_target)
+                    os.replace(tmp_target, target)
+                    logging.info(f"Copied flat model for version {version}")
+                else:
+                    model = joblib.load(self.active_model_path)
+                    compiled = CompiledForest.from_sklearn(model, source_hash=source_hash)
+                    compiled.save(target)
+                    logging.info(f"Compiled active model: {compiled.n_estimators} trees, "
+                                 f"{len(compiled.feature)} nodes")
+            
+            self._prune_compiled(keep=target)
+            
+        except Exception as e:
+            logging.warning(f"Active model not compiled: {str(e)}")
+            self._prune_compiled(keep=None)
+    
+    def _flat_model_matches(self, flat_path, source_hash):
+        try:
+            with open(os.path.join(flat_path, MANIFEST_FILENAME), 'r') as f:
+                return json.load(f).get('source_hash') == source_hash
+        except (OSError, ValueError):
+            return False
+    
+    def _prune_compiled(self, keep):
+        """
+        Remove compiled forms of previous models
+        
+        Best effort: a directory still memory-mapped by a scoring process
+        (Windows) is left for the next deploy.
+        """
+        if not os.path.isdir(self.active_compiled_dir):
+            return
+        for name in os.listdir(self.active_compiled_dir):
+            path = os.path.join(self.active_compiled_dir, name)
+            if keep is None or os.path.abspath(path) != os.path.abspath(keep):
+                shutil.rmtree(path, ignore_errors=True)
+    
     def _backup_current_model(self):
         """Backup current active model"""
         try:
@@ -5,8 +5,14 @@ Handles model training, evaluation, and versioning
 
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.inspection import permutation_importance
 from sklearn.model_selection import train_test_split
+from sklearn.utils.class_weight import compute_class_weight
+from .drift import PROFILE_SAMPLE_ROWS, build_reference_profile, save_profile
+from .sampling import PriorCorrectedClassifier, sample_training_rows
+from utils.compiled_forest import CompiledForest
+from utils.model_registry import file_hash
 from sklearn.metrics import (
     accuracy_score, precision_score, recall_score, 
     f1_score, roc_auc_score, confusion_matrix, classification_report
@@ -14,6 +20,7 @@ from sklearn.metrics import (
 import joblib
 import json
 import os
+import time
 from datetime import datetime
 import logging
 
@@ -23,8 +30,79 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+# Estimator name -> (class, default parameters). Every entry goes through the
+# same metrics, versioning and validation pipeline.
+ESTIMATORS = {
+    'random_forest': (RandomForestClassifier, {
+        'n_estimators': 100,
+        'max_depth': 10,
+        'min_samples_split': 5,
+        'min_samples_leaf': 2,
+        'class_weight': 'balanced',
+        'n_jobs': -1
+    }),
+    # Bins features into <=255 buckets and grows trees on the histograms, so
+    # training scales to tens of millions of rows; handles NaN natively
+    'hist_gradient_boosting': (HistGradientBoostingClassifier, {
+        'max_iter': 200,
+        'learning_rate': 0.1,
+        'max_leaf_nodes': 31,
+        'min_samples_leaf': 20,
+        'early_stopping': True,
+        'class_weight': 'balanced'
+    })
+}
+
+# Rows scored per feature for permutation importance, for estimators that
+# have no feature_importances_
+PERMUTATION_IMPORTANCE_ROWS = 10000
+
+# How a version's train/test rows were chosen (stored in its training summary).
+# A customer-hash split puts each customer_id on the same side in every run,
+# so no model trained on it has seen a later run's test customers.
+CUSTOMER_SPLIT = 'customer_hash'
+RANDOM_SPLIT = 'random'
+SPLIT_BUCKETS = 10000
+
+def build_estimator(name, random_state=42, **params):
+    """
+    Create an unfitted estimator from the ESTIMATORS registry
+    
+    Args:
+        name: Registry key
+        random_state: Random seed
+        **params: Overrides for the default parameters
+        
+    Returns:
+        Unfitted scikit-learn classifier
+    """
+    if name not in ESTIMATORS:
+        raise ValueError(f"Unknown estimator '{name}'. Choose from: {', '.join(ESTIMATORS)}")
+    estimator_class, defaults = ESTIMATORS[name]
+    return estimator_class(**{**defaults, **params, 'random_state': random_state})
+
+def model_size(model):
+    """Number of trees (random forest) or boosting iterations"""
+    if hasattr(model, 'n_iter_'):
+        return int(model.n_iter_)
+    return len(model.estimators_)
+
 class ModelTrainer:
-    def __init__(self):
+    def __init__(self, estimator='random_forest', sampling=None, params=None):
+        """
+        Args:
+            estimator: ESTIMATORS registry key
+            sampling: Optional training-row sampling for full retrains, e.g.
+                {'method': 'downsample_majority', 'majority_ratio': 3, 'max_rows': 2000000}
+                or {'method': 'stratified', 'max_rows': 2000000}
+            params: Optional fixed estimator parameters for full retrains;
+                they override the defaults and any tuned parameters
+        """
+        if estimator not in ESTIMATORS:
+            raise ValueError(f"Unknown estimator '{estimator}'. Choose from: {', '.join(ESTIMATORS)}")
+        self.estimator = estimator
+        self.sampling = sampling
+        self.params = params
         self.feature_columns = [
             'utilisation_pct', 'avg_payment_ratio', 'min_due_paid_frequency',
             'merchant_mix_index', 'cash_withdrawal_pct', 'recent_spend_change_pct'
@@ -32,56 +110,153 @@ class ModelTrainer:
         self.target_column = 'dpd_bucket_next_month'
         self.versions_dir = 'models/versions'
         self.metadata_dir = 'models/metadata'
+        self.active_model_path = 'models/active/model.pkl'
+        # joblib zlib level for version pickles (0 = uncompressed)
+        self.model_compression = 3
+        # Also save forests as memory-mappable node arrays (model_vX_Y_compiled/)
+        self.save_flat_model = True
+        self.last_split = None
+        # Warm-start mode: trees added per run, and the most trees kept
+        # (oldest are dropped first, giving a sliding window over runs)
+        self.warm_start_trees = 20
+        self.warm_start_max_trees = 300
+        self.warm_start_min_rows = 1000
         
-    def train_model(self, df, test_size=0.2, random_state=42):
+    def train_model(self, df, test_size=0.2, random_state=42, training_mode='full', recent_ids=None):
+        """
+        Train the configured estimator with new data
+        
+        Args:
+            df: Training dataframe
+            test_size: Test split ratio
+            random_state: Random seed
+            training_mode: 'full' or 'warm_start' (see train_model_arrays)
+            recent_ids: customer_ids of the latest upload, for warm_start
+            
+        Returns:
+            tuple: (model, metrics, version)
+        """
+        X, y = self.prepare_arrays(df)
+        recent_idx = None
+        if recent_ids is not None:
+            recent_idx = np.flatnonzero(df['customer_id'].isin(recent_ids).to_numpy())
+        ids = df['customer_id'].to_numpy() if 'customer_id' in df.columns else None
+        split = self.split_indices(y, test_size, random_state, ids=ids)
+        return self.train_model_arrays(
+            X, y, test_size, random_state, training_mode, recent_idx, split=split,
+            split_method=CUSTOMER_SPLIT if ids is not None else RANDOM_SPLIT
+        )
+    
+    def prepare_arrays(self, df):
         """
-        Train Random Forest model with new data
+        Extract the float32 feature matrix and binary labels from a dataframe
         
         Args:
             df: Training dataframe
+            
+        Returns:
+            tuple: (X, y) numpy arrays
+        """
+        X = np.ascontiguousarray(df[self.feature_columns].to_numpy(dtype=np.float32, na_value=np.nan))
+        y = (df[self.target_column] > 0).to_numpy(dtype=np.int8)
+        return X, y
+    
+    def train_model_arrays(self, X, y, test_size=0.2, random_state=42,
+                           training_mode='full', recent_idx=None, split=None, tuning=None,
+                           version=None, split_method=None):
+        """
+        Train the configured estimator on a prepared feature matrix
+        
+        X may be a read-only memory map from the FeatureStore; only the
+        split rows are copied. The split's row indices are kept in
+        last_split so validation can reuse the same held-out rows.
+        
+        In 'warm_start' mode the active model is extended with
+        warm_start_trees new trees fitted only on the recent training rows,
+        instead of refitting every tree on the full dataset. It falls back
+        to a full retrain if there is no active forest, too few recent rows,
+        or either split is not the customer-hash split (the kept trees
+        could otherwise have trained on this run's test rows).
+        
+        Args:
+            X: Feature matrix (float32, columns in feature_columns order)
+            y: Binary labels
             test_size: Test split ratio
             random_state: Random seed
+            training_mode: 'full' or 'warm_start'
+            recent_idx: Row positions of recently merged data (warm_start only;
+                all training rows if None)
+            split: Precomputed (train_idx, test_idx); split_indices() if None
+            split_method: How a precomputed split was made (CUSTOMER_SPLIT or
+                RANDOM_SPLIT); unknown splits are treated as random
+            tuning: Result of a tuning stage; its best_params override the
+                estimator defaults (full mode) and it is stored in the metadata
+            version: Version to save as (preassigned with next_versions when
+                several candidates train at once); next free version if None
             
         Returns:
             tuple: (model, metrics, version)
         """
+        if training_mode not in ('full', 'warm_start'):
+            raise ValueError(f"Unknown training_mode: {training_mode}")
+        
         try:
-            logging.info(f"Starting model training with {len(df)} samples")
+            logging.info(f"Starting model training with {len(X)} samples")
             
-            # Prepare features and target
-            X = df[self.feature_columns]
-            y = (df[self.target_column] > 0).astype(int)
+            # Split row indices rather than the data itself
+            if split is None:
+                split = self.split_indices(y, test_size, random_state)
+                split_method = RANDOM_SPLIT
+            split_method = split_method or RANDOM_SPLIT
+            train_idx, test_idx = split
+            self.last_split = (train_idx, test_idx)
             
-            # Split data
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=test_size, random_state=random_state, stratify=y
-            )
+            model, fit_idx = None, train_idx
+            if training_mode == 'warm_start':
+                model, fit_idx = self._prepare_warm_start(y, train_idx, recent_idx, split_method)
+                if model is None:
+                    training_mode = 'full'
+                    fit_idx = train_idx
+            sampling_summary = None
+            if model is None:
+                params = {**(tuning['best_params'] if tuning else {}), **(self.params or {})}
+                model = build_estimator(self.estimator, random_state, **params)
+                if self.sampling:
+                    fit_idx, sampling_summary = self._sample_rows(y, train_idx, random_state)
             
-            logging.info(f"Train: {len(X_train)}, Test: {len(X_test)}")
-            logging.info(f"Class distribution - 0: {sum(y_train==0)}, 1: {sum(y_train==1)}")
+            # Keep column names so the model accepts scoring dataframes as before
+            X_fit, y_fit = self.as_frame(X[fit_idx]), y[fit_idx]
+            X_test, y_test = self.as_frame(X[test_idx]), y[test_idx]
+            
+            logging.info(f"Estimator: {self.estimator}, Mode: {training_mode}, Train: {len(X_fit)}, Test: {len(X_test)}")
+            logging.info(f"Class distribution - 0: {sum(y_fit==0)}, 1: {sum(y_fit==1)}")
             
             # Train model
-            model = RandomForestClassifier(
-                n_estimators=100,
-                max_depth=10,
-                min_samples_split=5,
-                min_samples_leaf=2,
-                class_weight='balanced',
-                random_state=random_state,
-                n_jobs=-1
-            )
+            start = time.perf_counter()
+            model.fit(X_fit, y_fit)
+            train_seconds = time.perf_counter() - start
+            logging.info(f"Model training completed in {train_seconds:.1f}s")
             
-            model.fit(X_train, y_train)
-            logging.info("Model training completed")
+            if sampling_summary is not None:
+                model = self._recalibrate(model, sampling_summary)
             
             # Calculate metrics
-            metrics = self.calculate_metrics(model, X_test, y_test, X_train, y_train)
+            metrics = self.calculate_metrics(model, X_test, y_test, X_fit, y_fit)
+            metrics['training'] = self._training_summary(
+                training_mode, train_seconds, len(fit_idx), model, metrics['test_auc'],
+                split_method, X_test, y_test
+            )
+            metrics['training']['sampling'] = sampling_summary
+            if tuning and training_mode == 'full':
+                metrics['tuning'] = tuning
             
             # Get version number
-            version = self._get_next_version()
+            if version is None:
+                version = self._get_next_version()
             
             # Save model
-            model_path = self.save_model_version(model, version, metrics, len(df))
+            model_path = self.save_model_version(model, version, metrics, len(X))
+            self._save_reference_profile(model, X, train_idx, model_path, random_state)
             
             logging.info(f"Model saved: {model_path}")
             logging.info(f"Accuracy: {metrics['test_accuracy']:.4f}, AUC: {metrics['test_auc']:.4f}")
@@ -92,6 +267,231 @@ class ModelTrainer:
             logging.error(f"Error training model: {str(e)}")
             raise
     
+    def _sample_rows(self, y, train_idx, random_state):
+        """
+        Apply the sampling configuration to the training rows
+        
+        Returns:
+            tuple: (fit_idx, sampling summary dict)
+        """
+        fit_idx, keep_rates = sample_training_rows(
+            y, train_idx,
+            method=self.sampling['method'],
+            max_rows=self.sampling.get('max_rows'),
+            majority_ratio=self.sampling.get('majority_ratio', 3.0),
+            random_state=random_state
+        )
+        summary = {
+            **self.sampling,
+            'rows_before': int(len(train_idx)),
+            'rows_after': int(len(fit_idx)),
+            'positive_rate_before': float(np.mean(y[train_idx])),
+            'positive_rate_after': float(np.mean(y[fit_idx])),
+            **keep_rates
+        }
+        logging.info(
+            f"Sampled {len(fit_idx)} of {len(train_idx)} training rows ({self.sampling['method']})"
+        )
+        return fit_idx, summary
+    
+    def _recalibrate(self, model, sampling_summary):
+        """
+        Correct probabilities for the class ratio changed by sampling
+        
+        Balanced class weights already make the fitted prior independent of
+        the sample's class ratio, so only unweighted models are wrapped.
+        """
+        odds_factor = sampling_summary['keep_rate_0'] / max(sampling_summary['keep_rate_1'], 1e-12)
+        needs_correction = (
+            model.get_params().get('class_weight') is None
+            and not np.isclose(odds_factor, 1.0)
+        )
+        sampling_summary['odds_factor'] = float(odds_factor)
+        sampling_summary['recalibrated'] = bool(needs_correction)
+        if needs_correction:
+            return PriorCorrectedClassifier(model, odds_factor)
+        return model
+    
+    def _prepare_warm_start(self, y, train_idx, recent_idx, split_method):
+        """
+        Load the active forest and pick the rows its new trees are fitted on
+        
+        Returns:
+            tuple: (model, fit_idx), or (None, None) to fall back to a full retrain
+        """
+        if self.estimator != 'random_forest':
+            logging.info(f"Warm start: not supported for {self.estimator}, running full retrain")
+            return None, None
+        
+        if not os.path.exists(self.active_model_path):
+            logging.info("Warm start: no active model, running full retrain")
+            return None, None
+        
+        # The kept trees must never have seen this run's test rows
+        active_metadata = self._read_metadata(
+            os.path.join(os.path.dirname(self.active_model_path), 'metadata.json')
+        )
+        active_split = ((active_metadata or {}).get('training') or {}).get('split')
+        if split_method != CUSTOMER_SPLIT or active_split != CUSTOMER_SPLIT:
+            logging.info("Warm start: active model or this run is not on the customer-hash split, "
+                         "running full retrain")
+            return None, None
+        
+        model = joblib.load(self.active_model_path)
+        if not isinstance(model, RandomForestClassifier):
+            logging.info("Warm start: active model is not a random forest, running full retrain")
+            return None, None
+        
+        fit_idx = train_idx if recent_idx is None else np.intersect1d(train_idx, recent_idx)
+        if len(fit_idx) < self.warm_start_min_rows or len(np.unique(y[fit_idx])) < 2:
+            logging.info(f"Warm start: {len(fit_idx)} recent training rows, running full retrain")
+            return None, None
+        
+        # Drop the oldest trees so the forest stays within warm_start_max_trees
+        keep = self.warm_start_max_trees - self.warm_start_trees
+        if len(model.estimators_) > keep:
+            model.estimators_ = model.estimators_[-keep:]
+        
+        # 'balanced' would weight classes by the recent rows only; fix the
+        # weights from the whole training split instead
+        classes = np.unique(y[train_idx])
+        weights = compute_class_weight('balanced', classes=classes, y=y[train_idx])
+        
+        model.set_params(
+            warm_start=True,
+            n_estimators=len(model.estimators_) + self.warm_start_trees,
+            class_weight=dict(zip(classes.tolist(), weights.tolist()))
+        )
+        return model, fit_idx
+    
+    def _training_summary(self, training_mode, train_seconds, train_rows, model, test_auc,
+                          split_method, X_test, y_test):
+        """
+        Training cost and AUC relative to the latest full retrain
+        
+        The reference model is scored on this run's test rows; its stored
+        AUC came from a different test set. The comparison is skipped
+        unless both runs used the customer-hash split, since otherwise the
+        reference may have trained on these rows.
+        
+        Returns:
+            dict: Training summary stored in the version metadata
+        """
+        summary = {
+            'mode': training_mode,
+            'split': split_method,
+            'train_seconds': round(train_seconds, 3),
+            'train_rows': int(train_rows),
+            'n_estimators': model_size(model),
+            'reference_full_version': None,
+            'auc_vs_full': None
+        }
+        reference = self._latest_full_metadata()
+        if reference is None:
+            return summary
+        summary['reference_full_version'] = reference['version']
+        reference_path = os.path.join(
+            self.versions_dir, f"model_v{reference['version'].replace('.', '_')}.pkl"
+        )
+        if (
+            split_method == CUSTOMER_SPLIT
+            and (reference.get('training') or {}).get('split') == CUSTOMER_SPLIT
+            and os.path.exists(reference_path)
+            and len(np.unique(y_test)) > 1
+        ):
+            reference_model = joblib.load(reference_path)
+            reference_auc = roc_auc_score(y_test, reference_model.predict_proba(X_test)[:, 1])
+            summary['reference_full_auc'] = float(reference_auc)
+            summary['auc_vs_full'] = float(test_auc) - float(reference_auc)
+        return summary
+    
+    def _read_metadata(self, path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _latest_full_metadata(self):
+        """
+        Metadata of the newest version trained in full mode
+        
+        Returns:
+            dict: Model metadata, or None
+        """
+        # Versions saved before training modes existed were full retrains
+        return self._latest_metadata(
+            lambda metadata: (metadata.get('training') or {}).get('mode', 'full') == 'full'
+        )
+    
+    def get_cached_tuning(self):
+        """
+        Tuning result stored with the newest version of this estimator
+        
+        Returns:
+            dict: Tuning result (best_params, data_profile, ...), or None
+        """
+        metadata = self._latest_metadata(
+            lambda metadata: metadata.get('tuning') is not None
+            and metadata.get('estimator', 'random_forest') == self.estimator
+        )
+        return metadata['tuning'] if metadata else None
+    
+    def _latest_metadata(self, predicate):
+        """
+        Newest version metadata for which predicate(metadata) is true
+        
+        Returns:
+            dict: Model metadata, or None
+        """
+        latest, latest_key = None, None
+        if not os.path.isdir(self.metadata_dir):
+            return None
+        for filename in os.listdir(self.metadata_dir):
+            if not (filename.startswith('model_v') and filename.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(self.metadata_dir, filename), 'r') as f:
+                    metadata = json.load(f)
+                key = tuple(map(int, metadata['version'].split('.')))
+            except (ValueError, KeyError, OSError):
+                continue
+            if not predicate(metadata):
+                continue
+            if latest_key is None or key > latest_key:
+                latest, latest_key = metadata, key
+        return latest
+    
+    def split_indices(self, y, test_size=0.2, random_state=42, ids=None):
+        """
+        Train/test split of row positions
+        
+        With ids, a row's side depends only on a hash of its customer_id
+        (CUSTOMER_SPLIT): the same customer is a test row in every run,
+        whatever the row order, so models of earlier runs never trained on
+        it. Without ids, a stratified random split (RANDOM_SPLIT).
+        
+        Args:
+            y: Binary labels
+            test_size: Test split ratio
+            random_state: Random seed (random split only)
+            ids: Optional customer_id per row
+            
+        Returns:
+            tuple: (train_idx, test_idx) integer arrays
+        """
+        if ids is not None:
+            buckets = pd.util.hash_array(np.asarray(ids, dtype=object)) % SPLIT_BUCKETS
+            is_test = buckets < int(round(test_size * SPLIT_BUCKETS))
+            return np.flatnonzero(~is_test), np.flatnonzero(is_test)
+        return train_test_split(
+            np.arange(len(y)), test_size=test_size, random_state=random_state, stratify=y
+        )
+    
+    def as_frame(self, X):
+        """Wrap a feature matrix in a dataframe with the feature column names, without copying"""
+        return pd.DataFrame(X, columns=self.feature_columns, copy=False)
+    
     def calculate_metrics(self, model, X_test, y_test, X_train=None, y_train=None):
         """
         Calculate comprehensive model metrics
@@ -127,9 +527,23 @@ class ModelTrainer:
             metrics['train_accuracy'] = accuracy_score(y_train, y_train_pred)
         
         # Feature importance
+        if hasattr(model, 'feature_importances_'):
+            importances = model.feature_importances_
+        else:
+            # Boosting models have no impurity importances; use the AUC lost
+            # when each feature is shuffled on a sample of the test set
+            n_rows = min(len(X_test), PERMUTATION_IMPORTANCE_ROWS)
+            rows = np.random.default_rng(0).choice(len(X_test), n_rows, replace=False)
+            result = permutation_importance(
+                model, X_test.iloc[rows], np.asarray(y_test)[rows],
+                scoring='roc_auc', n_repeats=3, random_state=0
+            )
+            importances = np.clip(result.importances_mean, 0, None)
+            if importances.sum() > 0:
+                importances = importances / importances.sum()
         feature_importance = dict(zip(
             self.feature_columns,
-            model.feature_importances_.tolist()
+            importances.tolist()
         ))
         metrics['feature_importance'] = feature_importance
         
@@ -152,11 +566,16 @@ class ModelTrainer:
             # Save model
             model_filename = f"model_v{version.replace('.', '_')}.pkl"
             model_path = os.path.join(self.versions_dir, model_filename)
-            joblib.dump(model, model_path)
+            joblib.dump(model, model_path, compress=self.model_compression)
+            
+            if self.save_flat_model:
+                self._save_flat_model(model, model_path)
             
             # Save metadata
             metadata = {
                 'version': version,
+                'estimator': self.estimator,
+                'params': self.params,
                 'training_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'data_size': data_size,
                 'metrics': {
@@ -168,6 +587,8 @@ class ModelTrainer:
                 },
                 'feature_importance': metrics['feature_importance'],
                 'confusion_matrix': metrics['confusion_matrix'],
+                'training': metrics.get('training'),
+                'tuning': metrics.get('tuning'),
                 'deployed': False,
                 'deployment_date': None
             }
@@ -186,6 +607,36 @@ class ModelTrainer:
             logging.error(f"Error saving model version: {str(e)}")
             raise
     
+    def _save_reference_profile(self, model, X, train_idx, model_path, random_state=42):
+        """
+        Save feature and score histograms of the training population
+        
+        The deployer installs the profile with the model, so drift checks
+        only have to bin new data against it.
+        """
+        rows = train_idx
+        if len(rows) > PROFILE_SAMPLE_ROWS:
+            rows = np.sort(np.random.default_rng(random_state).choice(rows, PROFILE_SAMPLE_ROWS, replace=False))
+        X_ref = self.as_frame(X[rows])
+        scores = model.predict_proba(X_ref)[:, 1]
+        profile = build_reference_profile(X_ref.to_numpy(), scores, self.feature_columns)
+        save_profile(profile, model_path[:-len('.pkl')] + '_profile.json')
+    
+    def _save_flat_model(self, model, model_path):
+        """
+        Save a forest's node arrays next to its pickle
+        
+        The directory records the pickle's hash, so the deployer can copy it
+        instead of recompiling. Non-forest models are skipped.
+        """
+        flat_path = model_path[:-len('.pkl')] + '_compiled'
+        try:
+            compiled = CompiledForest.from_sklearn(model, source_hash=file_hash(model_path))
+        except TypeError:
+            return
+        compiled.save(flat_path)
+        logging.info(f"Flat model saved: {flat_path}")
+    
     def _get_next_version(self):
         """
         Get next version number
@@ -220,6 +671,19 @@ class ModelTrainer:
             logging.error(f"Error getting next version: {str(e)}")
             return "1.0"
     
+    def next_versions(self, count):
+        """
+        Reserve consecutive version numbers for candidates trained together
+        
+        Args:
+            count: Number of versions
+            
+        Returns:
+            list: Version strings, starting at the next free version
+        """
+        major, minor = map(int, self._get_next_version().split('.'))
+        return [f"{major}.{minor + i}" for i in range(count)]
+    
     def get_model_info(self, version):
         """
         Get metadata for a specific model version
@@ -10,6 +10,11 @@ import numpy as np
 from sklearn.metrics import accuracy_score, roc_auc_score
 import logging
 
+from .drift import PSI_MAJOR, compare_to_reference, load_profile
+from .prediction_cache import PredictionCache
+from utils.model_registry import file_hash
+from utils.shadow_scorer import load_shadow_summary
+
 logging.basicConfig(
     filename='logs/retraining.log',
     level=logging.INFO,
@@ -20,15 +25,24 @@ class ModelValidator:
     def __init__(self):
         self.active_model_path = 'models/active/model.pkl'
         self.active_metadata_path = 'models/active/metadata.json'
+        self.active_profile_path = 'models/active/reference_profile.json'
         self.metadata_dir = 'models/metadata'
+        self.shadow_dir = 'models/shadow'
+        self.prediction_cache = PredictionCache()
+        self._active_model = None
         
         # Validation thresholds
         self.min_accuracy = 0.70
         self.min_auc = 0.65
         self.max_accuracy_drop = 0.05  # Max 5% drop allowed
-        self.max_drift_threshold = 0.15  # Max 15% drift
+        self.max_drift_threshold = 0.15  # Max 15% drift (legacy check, no reference profile)
+        self.max_score_psi = PSI_MAJOR  # Max PSI of new scores vs the active model's reference
+        # Shadow scoring evidence (used once enough live rows were shadowed)
+        self.min_shadow_rows = 10000
+        self.max_shadow_flip_rate = 0.10  # Max share of live customers changing tier
+        self.max_shadow_mean_delta = 5.0  # Max mean score shift (0-100 scale)
         
-    def validate_model(self, new_model_version, X_test, y_test):
+    def validate_model(self, new_model_version, X_test, y_test, new_scores=None):
         """
         Validate new model against current production model
         
@@ -36,6 +50,8 @@ class ModelValidator:
             new_model_version: Version string of new model
             X_test: Test features
             y_test: Test labels
+            new_scores: New model's probabilities on X_test, if already
+                computed (the model is then not loaded)
             
         Returns:
             tuple: (should_deploy: bool, validation_report: dict)
@@ -44,13 +60,19 @@ class ModelValidator:
             logging.info(f"Validating model version {new_model_version}")
             
             # Load new model and metadata
-            new_model, new_metadata = self._load_model_version(new_model_version)
-            
-            if new_model is None:
-                return False, {'error': 'New model not found'}
+            if new_scores is None:
+                new_model, new_metadata = self._load_model_version(new_model_version)
+                if new_model is None:
+                    return False, {'error': 'New model not found'}
+            else:
+                new_metadata = self._load_version_metadata(new_model_version)
+                if new_metadata is None:
+                    return False, {'error': 'New model not found'}
             
-            # Load current active model
-            current_model, current_metadata = self._load_active_model()
+            # Active metadata only; the model itself is loaded if its
+            # predictions are not all cached
+            current_metadata = self._load_active_metadata()
+            self._active_model = None
             
             # Validation report
             report = {
@@ -75,7 +97,7 @@ class ModelValidator:
                 report['reason'].append(f"AUC {new_auc:.4f} below minimum {self.min_auc}")
             
             # Check 2: Compare with current model
-            if current_model is not None and current_metadata is not None:
+            if current_metadata is not None:
                 current_accuracy = current_metadata['metrics']['accuracy']
                 current_auc = current_metadata['metrics']['auc']
                 
@@ -101,13 +123,58 @@ class ModelValidator:
                 if not report['checks']['accuracy_improvement']:
                     report['reason'].append(f"Accuracy dropped by {abs(accuracy_diff):.4f} (max allowed: {self.max_accuracy_drop})")
                 
+                # Both models on the same held-out rows; the active model's
+                # scores come from the cache where the rows were seen before
+                if new_scores is None:
+                    new_scores = new_model.predict_proba(X_test)[:, 1]
+                current_scores, cache_stats = self.prediction_cache.get_scores(
+                    current_metadata.get('version', 'unknown'), X_test, self._score_with_active_model
+                )
+                report['prediction_cache'] = cache_stats
+                report['prediction_drift'] = float(np.mean(np.abs(new_scores - current_scores)))
+                report['metrics_comparison']['auc_same_test'] = {
+                    'current': float(roc_auc_score(y_test, current_scores)),
+                    'new': float(roc_auc_score(y_test, new_scores))
+                }
+                
                 # Check 3: Drift detection
-                drift_score = self.check_drift(new_model, current_model, X_test)
-                report['checks']['drift_acceptable'] = drift_score < self.max_drift_threshold
-                report['drift_score'] = drift_score
+                profile = load_profile(self.active_profile_path)
+                if profile is not None:
+                    drift = self.check_population_drift(X_test, new_scores, profile)
+                    drift_score = drift['score']['psi']
+                    report['checks']['drift_acceptable'] = drift_score <= self.max_score_psi
+                    report['drift_score'] = drift_score
+                    report['drift'] = drift
+                    
+                    if not report['checks']['drift_acceptable']:
+                        report['reason'].append(f"Score PSI {drift_score:.4f} exceeds threshold {self.max_score_psi}")
+                    if drift['drifted_features']:
+                        # Informational: retraining on the shifted population is the remedy
+                        report['reason'].append(f"Population shift in: {', '.join(drift['drifted_features'])}")
+                else:
+                    drift_score = report['prediction_drift']
+                    logging.info(f"Prediction drift: {drift_score:.4f}")
+                    report['checks']['drift_acceptable'] = drift_score < self.max_drift_threshold
+                    report['drift_score'] = drift_score
+                    
+                    if not report['checks']['drift_acceptable']:
+                        report['reason'].append(f"Prediction drift {drift_score:.4f} exceeds threshold {self.max_drift_threshold}")
                 
-                if not report['checks']['drift_acceptable']:
-                    report['reason'].append(f"Prediction drift {drift_score:.4f} exceeds threshold {self.max_drift_threshold}")
+                # Check 4: Live traffic scored in shadow mode, if any
+                shadow = self.check_shadow_evidence(new_model_version)
+                if shadow is not None:
+                    report['shadow'] = shadow
+                    if shadow['used']:
+                        report['checks']['shadow_acceptable'] = (
+                            shadow['flip_rate'] <= self.max_shadow_flip_rate
+                            and abs(shadow['mean_delta']) <= self.max_shadow_mean_delta
+                        )
+                        if not report['checks']['shadow_acceptable']:
+                            report['reason'].append(
+                                f"Shadow scoring: {shadow['flip_rate']:.2%} tier flips, mean score shift "
+                                f"{shadow['mean_delta']:+.2f} (limits: {self.max_shadow_flip_rate:.0%} flips, "
+                                f"{self.max_shadow_mean_delta} points)"
+                            )
             
             else:
                 # No current model, deploy if meets minimum thresholds
@@ -133,32 +200,125 @@ class ModelValidator:
             logging.error(f"Error validating model: {str(e)}")
             return False, {'error': str(e)}
     
-    def check_drift(self, new_model, current_model, X_test):
+    def select_best(self, versions, X_test, y_test, chunk_rows=100000):
         """
-        Check prediction drift between models
+        Champion/challenger selection among candidates trained on the same split
+        
+        The test rows are read once, in chunks, and every chunk is scored by
+        all candidates. Each candidate then goes through validate_model with
+        its precomputed scores. The passing candidate with the highest AUC
+        on the shared test rows is selected.
         
         Args:
-            new_model: New trained model
-            current_model: Current production model
-            X_test: Test features
+            versions: Candidate version strings
+            X_test: Test features (shared by all candidates)
+            y_test: Test labels
+            chunk_rows: Test rows scored per chunk
             
         Returns:
-            float: Drift score (0-1, lower is better)
+            tuple: (best version or None, selection report dict)
         """
-        try:
-            # Get predictions from both models
-            new_pred = new_model.predict_proba(X_test)[:, 1]
-            current_pred = current_model.predict_proba(X_test)[:, 1]
-            
-            # Calculate mean absolute difference
-            drift = np.mean(np.abs(new_pred - current_pred))
+        models = {}
+        for version in versions:
+            model, _ = self._load_model_version(version)
+            if model is not None:
+                models[version] = model
+        
+        scores = {version: np.empty(len(X_test)) for version in models}
+        for start in range(0, len(X_test), chunk_rows):
+            chunk = X_test.iloc[start:start + chunk_rows]
+            for version, model in models.items():
+                scores[version][start:start + len(chunk)] = model.predict_proba(chunk)[:, 1]
+        del models
+        
+        selection = {'candidates': {}, 'selected': None}
+        best_version, best_auc = None, None
+        for version in versions:
+            if version not in scores:
+                selection['candidates'][version] = {'recommendation': 'REJECT', 'report': {'error': 'Model not found'}}
+                continue
+            passed, report = self.validate_model(version, X_test, y_test, new_scores=scores[version])
+            auc = float(roc_auc_score(y_test, scores[version]))
+            selection['candidates'][version] = {
+                'auc_same_test': auc,
+                'recommendation': report.get('recommendation', 'REJECT'),
+                'report': report
+            }
+            if passed and (best_auc is None or auc > best_auc):
+                best_version, best_auc = version, auc
+        
+        selection['selected'] = best_version
+        if best_version is None:
+            logging.warning(f"No candidate passed validation: {list(versions)}")
+        else:
+            logging.info(f"Selected candidate {best_version} (AUC {best_auc:.4f} on shared test rows)")
+        return best_version, selection
+    
+    def check_shadow_evidence(self, version):
+        """
+        Summarize shadow scoring of a candidate on live batches
+        
+        The evidence is used only if it was collected against the current
+        active model and covers at least min_shadow_rows rows.
+        
+        Args:
+            version: Candidate version
             
-            logging.info(f"Prediction drift: {drift:.4f}")
-            return drift
+        Returns:
+            dict: rows, mean_delta, mean_abs_delta, flip_rate, escalations,
+                de_escalations, dropped_batches, processes and used; None if the
+                version was never shadowed
+        """
+        active_hash = (
+            file_hash(self.active_model_path) if os.path.exists(self.active_model_path) else None
+        )
+        summary = (
+            load_shadow_summary(self.shadow_dir, version, active_hash) if active_hash else None
+        )
+        current = summary is not None
+        if summary is None:
+            # Only rows compared with an earlier active model, if any
+            summary = load_shadow_summary(self.shadow_dir, version)
+            if summary is None:
+                return None
+        shadow = {
+            key: summary[key] for key in (
+                'rows', 'mean_delta', 'mean_abs_delta', 'flip_rate',
+                'escalations', 'de_escalations', 'dropped_batches', 'processes', 'updated'
+            )
+        }
+        shadow['used'] = current and summary['rows'] >= self.min_shadow_rows
+        if not current:
+            shadow['note'] = 'Collected against a different active model'
+        elif not shadow['used']:
+            shadow['note'] = f"Fewer than {self.min_shadow_rows} rows shadowed"
+        logging.info(
+            f"Shadow evidence for {version}: {summary['rows']} rows, "
+            f"flip rate {summary['flip_rate']:.4f}, used: {shadow['used']}"
+        )
+        return shadow
+    
+    def check_population_drift(self, X_test, new_scores, profile):
+        """
+        PSI and KS of the test features and new scores against the active
+        model's reference profile
+        
+        The reference set is not re-scored; only X_test is binned.
+        
+        Args:
+            X_test: Test features
+            new_scores: New model's probabilities on X_test
+            profile: Active model's reference profile
             
-        except Exception as e:
-            logging.error(f"Error checking drift: {str(e)}")
-            return 1.0  # Return high drift on error
+        Returns:
+            dict: Per-feature and score psi/ks (see drift.compare_to_reference)
+        """
+        drift = compare_to_reference(profile, X_test, new_scores)
+        logging.info(
+            f"Score PSI: {drift['score']['psi']:.4f}, KS: {drift['score']['ks']:.4f}, "
+            f"max feature PSI: {drift['max_feature_psi']:.4f}"
+        )
+        return drift
     
     def _load_model_version(self, version):
         """Load specific model version and metadata"""
@@ -180,6 +340,35 @@ class ModelValidator:
             logging.error(f"Error loading model version {version}: {str(e)}")
             return None, None
     
+    def _load_version_metadata(self, version):
+        """Load the metadata of a model version, or None if it is missing"""
+        try:
+            metadata_filename = f"model_v{version.replace('.', '_')}.json"
+            with open(os.path.join(self.metadata_dir, metadata_filename), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.error(f"Error loading metadata of version {version}: {str(e)}")
+            return None
+    
+    def _score_with_active_model(self, X):
+        """Class-1 probabilities from the active model, loaded on first use"""
+        if self._active_model is None:
+            self._active_model, _ = self._load_active_model()
+            if self._active_model is None:
+                raise FileNotFoundError("Active model not found")
+        return self._active_model.predict_proba(X)[:, 1]
+    
+    def _load_active_metadata(self):
+        """Load current active metadata, or None if no model is active"""
+        try:
+            if os.path.exists(self.active_model_path) and os.path.exists(self.active_metadata_path):
+                with open(self.active_metadata_path, 'r') as f:
+                    return json.load(f)
+            return None
+        except Exception as e:
+            logging.error(f"Error loading active metadata: {str(e)}")
+            return None
+    
     def _load_active_model(self):
         """Load current active model and metadata"""
         try:
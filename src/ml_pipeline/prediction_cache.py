@@ -0,0 +1,100 @@
+"""
+Prediction Cache Module
+Reuses the active model's validation-set predictions across pipeline runs
+"""
+
+import os
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+
+logging.basicConfig(
+    filename='logs/retraining.log',
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+class PredictionCache:
+    def __init__(self, cache_dir='data/training/prediction_cache'):
+        self.cache_dir = cache_dir
+
+    def _cache_path(self, version):
+        return os.path.join(self.cache_dir, f"active_v{version.replace('.', '_')}.npz")
+
+    @staticmethod
+    def row_keys(X):
+        """64-bit fingerprint of each row's feature values"""
+        return pd.util.hash_pandas_object(X, index=False).to_numpy()
+
+    def _load(self, version):
+        path = self._cache_path(version)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=np.uint64), np.empty(0), None
+        try:
+            with np.load(path) as data:
+                return data['keys'], data['scores'], float(data['seconds_per_row'])
+        except (OSError, ValueError, KeyError):
+            return np.empty(0, dtype=np.uint64), np.empty(0), None
+
+    def _save(self, version, keys, scores, seconds_per_row):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_path(version)
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, keys=keys, scores=scores, seconds_per_row=np.asarray(seconds_per_row))
+        os.replace(tmp_path, path)
+        # Predictions of other versions can never be reused
+        for filename in os.listdir(self.cache_dir):
+            if filename.endswith('.npz') and os.path.join(self.cache_dir, filename) != path:
+                os.remove(os.path.join(self.cache_dir, filename))
+
+    def get_scores(self, version, X, score_fn):
+        """
+        Active-model probabilities for X, scoring only rows not seen before
+
+        The cache for a version keeps the rows of the latest X, so it stays
+        the size of one validation set.
+
+        Args:
+            version: Active model version (cache key)
+            X: Feature DataFrame
+            score_fn: Callable scoring a DataFrame, returning class-1 probabilities;
+                not called if every row is cached
+
+        Returns:
+            tuple: (scores array, stats dict with rows, cached_rows,
+                scored_rows, score_seconds, saved_seconds)
+        """
+        keys = self.row_keys(X)
+        cached_keys, cached_scores, seconds_per_row = self._load(version)
+
+        scores = np.empty(len(X), dtype=np.float64)
+        position = np.searchsorted(cached_keys, keys)
+        position = np.minimum(position, max(len(cached_keys) - 1, 0))
+        hit = (cached_keys[position] == keys) if len(cached_keys) else np.zeros(len(X), dtype=bool)
+        scores[hit] = cached_scores[position[hit]]
+
+        miss = ~hit
+        score_seconds = 0.0
+        if miss.any():
+            start = time.perf_counter()
+            scores[miss] = score_fn(X[miss])
+            score_seconds = time.perf_counter() - start
+            seconds_per_row = score_seconds / int(miss.sum())
+
+        unique_keys, first = np.unique(keys, return_index=True)
+        self._save(version, unique_keys, scores[first], seconds_per_row or 0.0)
+
+        stats = {
+            'rows': int(len(X)),
+            'cached_rows': int(hit.sum()),
+            'scored_rows': int(miss.sum()),
+            'score_seconds': round(score_seconds, 3),
+            'saved_seconds': round((seconds_per_row or 0.0) * int(hit.sum()), 3)
+        }
+        logging.info(
+            f"Active-model predictions: {stats['cached_rows']} cached, {stats['scored_rows']} scored "
+            f"({stats['score_seconds']}s, ~{stats['saved_seconds']}s saved)"
+        )
+        return scores, stats
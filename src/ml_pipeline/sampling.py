@@ -0,0 +1,96 @@
+"""
+Sampling Module
+Bounds training cost on large masters by sampling the training rows, and
+corrects predicted probabilities for the class ratio the sample changed
+"""
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.model_selection import train_test_split
+
+SAMPLING_METHODS = ('downsample_majority', 'stratified')
+
+def sample_training_rows(y, rows, method, max_rows=None, majority_ratio=3.0, random_state=42):
+    """
+    Pick the training rows to fit on
+
+    'downsample_majority' keeps every minority-class row and majority_ratio
+    majority rows per minority row. 'stratified' draws max_rows rows with the
+    class ratio unchanged. Either result is then capped at max_rows, keeping
+    the class ratio.
+
+    Args:
+        y: Binary labels for the whole matrix
+        rows: Candidate row positions (the training split)
+        method: One of SAMPLING_METHODS
+        max_rows: Largest sample (no cap if None)
+        majority_ratio: Majority rows kept per minority row (downsample_majority)
+        random_state: Random seed
+
+    Returns:
+        tuple: (sorted row positions, dict with per-class keep rates)
+    """
+    if method not in SAMPLING_METHODS:
+        raise ValueError(f"Unknown sampling method '{method}'. Choose from: {', '.join(SAMPLING_METHODS)}")
+
+    rows = np.asarray(rows)
+    labels = np.asarray(y[rows])
+    rng = np.random.default_rng(random_state)
+    sampled = rows
+
+    if method == 'downsample_majority':
+        counts = np.bincount(labels, minlength=2)
+        majority = int(np.argmax(counts))
+        minority_rows = rows[labels != majority]
+        majority_rows = rows[labels == majority]
+        n_majority = min(len(majority_rows), int(round(majority_ratio * len(minority_rows))))
+        if n_majority < len(majority_rows):
+            majority_rows = rng.choice(majority_rows, n_majority, replace=False)
+        sampled = np.concatenate([minority_rows, majority_rows])
+
+    if max_rows is not None and len(sampled) > max_rows:
+        sampled, _ = train_test_split(
+            sampled, train_size=max_rows, random_state=random_state, stratify=np.asarray(y[sampled])
+        )
+
+    sampled = np.sort(sampled)
+    sampled_counts = np.bincount(np.asarray(y[sampled]), minlength=2)
+    total_counts = np.bincount(labels, minlength=2)
+    keep_rates = (sampled_counts / np.maximum(total_counts, 1)).tolist()
+    return sampled, {'keep_rate_0': keep_rates[0], 'keep_rate_1': keep_rates[1]}
+
+class PriorCorrectedClassifier(BaseEstimator, ClassifierMixin):
+    """
+    Undo the class-prior shift of a model fitted on a class-skewed sample.
+
+    If the sample kept class 0 at rate k0 and class 1 at rate k1, the sample
+    odds are the population odds times k1 / k0, so predicted odds are
+    multiplied by odds_factor = k0 / k1.
+
+    Only needed for unweighted models: with class_weight='balanced' the
+    weights already rebalance the sample to 50/50, exactly as they do the
+    full data, so the correction would be the identity.
+    """
+
+    def __init__(self, model=None, odds_factor=1.0):
+        self.model = model
+        self.odds_factor = odds_factor
+
+    def fit(self, X, y):
+        self.model.fit(X, y)
+        return self
+
+    def predict_proba(self, X):
+        p = self.model.predict_proba(X)[:, 1]
+        corrected = self.odds_factor * p / (self.odds_factor * p + (1 - p))
+        return np.column_stack([1 - corrected, corrected])
+
+    def predict(self, X):
+        return self.classes_[(self.predict_proba(X)[:, 1] >= 0.5).astype(int)]
+
+    def __getattr__(self, name):
+        # Fitted attributes (classes_, feature_names_in_, estimators_, ...)
+        # come from the wrapped model
+        if name.startswith('__') or name == 'model':
+            raise AttributeError(name)
+        return getattr(self.model, name)
@@ -4,14 +4,23 @@ Automates the retraining pipeline on a schedule
 """
 
 import schedule
+import threading
 import time
+import os
 from datetime import datetime
 import logging
+import numpy as np
 from .data_manager import DataManager
-from .model_trainer import ModelTrainer
+from .model_trainer import CUSTOMER_SPLIT, RANDOM_SPLIT, ModelTrainer
 from .model_validator import ModelValidator
 from .model_deployer import ModelDeployer
-from sklearn.model_selection import train_test_split
+from .feature_store import FeatureStore
+from .candidates import train_candidates
+from .tuner import HyperparameterTuner, data_profile, data_shifted
+from .drift import PSI_MAJOR
+from utils.drift_monitor import SharedDriftMonitor, set_recording
+from utils.shadow_scorer import load_shadow_summary, set_shadow_version, shadow_version
+from utils.model_registry import file_hash
 
 logging.basicConfig(
     filename='logs/retraining.log',
@@ -20,19 +29,41 @@ logging.basicConfig(
 )
 
 class RetrainingScheduler:
-    def __init__(self):
+    def __init__(self, estimator='random_forest', sampling=None):
         self.data_manager = DataManager()
-        self.model_trainer = ModelTrainer()
+        self.model_trainer = ModelTrainer(estimator=estimator, sampling=sampling)
         self.model_validator = ModelValidator()
         self.model_deployer = ModelDeployer()
+        self.feature_store = FeatureStore()
+        self.shadow_dir = 'models/shadow'
+        self.drift_state_dir = 'models/drift'
+        # One pipeline run at a time (scheduled or drift-triggered)
+        self._pipeline_lock = threading.Lock()
         
-    def run_pipeline(self):
+    def run_pipeline(self, training_mode='full', tune=False, trigger='schedule', candidates=None):
         """
         Execute the complete retraining pipeline
         
+        Args:
+            training_mode: 'full' retrain, or 'warm_start' to add trees
+                fitted on the newly merged rows to the active model
+            tune: Run the hyperparameter search before a full retrain
+                (skipped when cached parameters still fit the data)
+            trigger: What started the run ('schedule', 'drift', ...), for the report
+            candidates: Optional list of candidate specs (see
+                candidates.train_candidates) trained in parallel instead of
+                the single configured model; the best one that passes
+                validation is deployed. Full retrains only; tune is ignored.
+        
         Returns:
             dict: Pipeline execution report
         """
+        if candidates and training_mode != 'full':
+            raise ValueError("Candidate runs only support training_mode='full'")
+        with self._pipeline_lock:
+            return self._run_pipeline(training_mode, tune, trigger, candidates)
+    
+    def _run_pipeline(self, training_mode, tune, trigger, candidates=None):
         try:
             logging.info("="*50)
             logging.info("Starting retraining pipeline")
@@ -40,6 +71,7 @@ class RetrainingScheduler:
             
             report = {
                 'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'trigger': trigger,
                 'steps': {},
                 'success': False
             }
@@ -57,21 +89,58 @@ class RetrainingScheduler:
             
             # Step 2: Merge and clean data
             logging.info("Merging and cleaning data...")
-            df = self.data_manager.merge_and_clean_data()
+            store_signature = self.feature_store.get_source_signature(
+                self.model_trainer.feature_columns, self.model_trainer.target_column
+            )
+            self.data_manager.merge_and_clean_data(load=False)
             report['steps']['data_merged'] = True
-            report['steps']['total_rows'] = len(df)
+            report['steps']['ingest'] = self.data_manager.last_ingest_report
+            
+            # Training and validation read the feature store's memory maps.
+            # If it matches the master as it was before this merge, only the
+            # new segments are applied to it instead of re-reading the history.
+            X, y, recent_idx = self._refresh_feature_store(store_signature, training_mode)
+            report['steps']['feature_store'] = self.feature_store.get_meta()['refresh']
+            report['steps']['total_rows'] = len(y)
+            
+            # Split on customer_id so a customer stays on the same side in
+            # every run (warm-started trees never saw a later test row)
+            ids = self.feature_store.load_ids()
+            split = self.model_trainer.split_indices(y, ids=ids)
+            split_method = CUSTOMER_SPLIT if ids is not None else RANDOM_SPLIT
+            del ids
+            
+            if candidates:
+                should_deploy, version = self._train_and_select(
+                    X, y, split, split_method, candidates, report
+                )
+                return self._deploy_if_valid(should_deploy, version, report)
+            
+            # Optional: tune hyperparameters on the training rows
+            tuning = None
+            if tune and training_mode == 'full':
+                logging.info("Tuning hyperparameters...")
+                tuning = self.tune_hyperparameters(X, y, split[0])
+                report['steps']['tuning'] = {
+                    k: v for k, v in tuning.items() if k != 'data_profile'
+                }
             
             # Step 3: Train new model
             logging.info("Training new model...")
-            model, metrics, version = self.model_trainer.train_model(df)
+            model, metrics, version = self.model_trainer.train_model_arrays(
+                X, y, training_mode=training_mode, recent_idx=recent_idx,
+                split=split, split_method=split_method, tuning=tuning
+            )
             report['steps']['model_trained'] = True
+            report['steps']['training'] = metrics['training']
             report['steps']['new_version'] = version
             report['steps']['metrics'] = metrics
             
-            # Step 4: Prepare test data for validation
-            X = df[self.model_trainer.feature_columns]
-            y = (df[self.model_trainer.target_column] > 0).astype(int)
-            _, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+            # Step 4: Reuse the trainer's held-out rows for validation
+            train_idx, test_idx = self.model_trainer.last_split
+            self.feature_store.save_split(train_idx, test_idx)
+            X_test = self.model_trainer.as_frame(X[test_idx])
+            y_test = y[test_idx]
             
             # Step 5: Validate new model
             logging.info("Validating new model...")
@@ -80,53 +149,307 @@ class RetrainingScheduler:
             )
             report['steps']['validation'] = validation_report
             
-            # Step 6: Deploy if validation passed
-            if should_deploy:
-                logging.info("Validation passed, deploying model...")
-                deployment_success = self.model_deployer.deploy_model(version)
-                report['steps']['deployed'] = deployment_success
-                
-                if deployment_success:
-                    logging.info(f"Successfully deployed model version {version}")
-                    report['success'] = True
-                else:
-                    logging.error("Deployment failed")
-            else:
-                logging.warning("Validation failed, model not deployed")
-                report['steps']['deployed'] = False
-                report['steps']['rejection_reason'] = validation_report.get('reason', [])
-            
-            logging.info("="*50)
-            logging.info("Pipeline execution completed")
-            logging.info("="*50)
-            
-            return report
+            return self._deploy_if_valid(should_deploy, version, report)
             
         except Exception as e:
             logging.error(f"Pipeline execution failed: {str(e)}")
             report['error'] = str(e)
             return report
     
-    def schedule_daily(self, time_str="02:00"):
+    def _refresh_feature_store(self, store_signature, training_mode):
+        """
+        Bring the feature store up to date with the merged master dataset
+        
+        Args:
+            store_signature: Store's source signature before the merge
+            training_mode: 'warm_start' also needs the rows of this merge
+            
+        Returns:
+            tuple: (X, y, recent_idx) with X and y read-only memory maps;
+                recent_idx is None unless training_mode is 'warm_start'
+        """
+        source_signature = self.data_manager.get_storage_signature()
+        changes = None
+        if store_signature is not None:
+            changes = self.data_manager.get_rows_since(store_signature)
+        
+        if changes is not None:
+            new_rows, replaced_ids = changes
+            X, y = self.feature_store.update(new_rows, source_signature, replaced_ids)
+            recent_idx = np.arange(len(y) - len(new_rows), len(y))
+        else:
+            # No usable store, or the master was rewritten (compaction)
+            df = self.data_manager.get_training_data()
+            X, y = self.feature_store.build(
+                df,
+                self.model_trainer.feature_columns,
+                self.model_trainer.target_column,
+                source_signature=source_signature
+            )
+            recent_idx = np.flatnonzero(
+                df['customer_id'].isin(self.data_manager.last_merged_ids).to_numpy()
+            )
+            del df
+        return X, y, (recent_idx if training_mode == 'warm_start' else None)
+    
+    def _train_and_select(self, X, y, split, split_method, candidates, report):
+        """
+        Champion/challenger: train all candidates in parallel, validate each
+        against the active model and keep the best that passes
+        
+        Returns:
+            tuple: (should_deploy, selected version or None)
+        """
+        logging.info(f"Training {len(candidates)} candidate models...")
+        versions = self.model_trainer.next_versions(len(candidates))
+        results = train_candidates(candidates, X, y, split, versions, split_method=split_method)
+        report['steps']['model_trained'] = any(r['version'] for r in results)
+        report['steps']['candidates'] = results
+        
+        train_idx, test_idx = split
+        self.feature_store.save_split(train_idx, test_idx)
+        X_test = self.model_trainer.as_frame(X[test_idx])
+        y_test = y[test_idx]
+        
+        logging.info("Validating candidate models...")
+        trained = [r['version'] for r in results if r['version']]
+        version, selection = self.model_validator.select_best(trained, X_test, y_test)
+        report['steps']['selection'] = selection
+        report['steps']['new_version'] = version
+        if version is not None:
+            selected = next(r for r in results if r['version'] == version)
+            logging.info(f"Candidate '{selected['name']}' selected as version {version}")
+            report['steps']['training'] = selected['training']
+            report['steps']['validation'] = selection['candidates'][version]['report']
+        else:
+            report['steps']['validation'] = {
+                'recommendation': 'REJECT',
+                'reason': ["No candidate passed validation"]
+            }
+        return version is not None, version
+    
+    def _deploy_if_valid(self, should_deploy, version, report):
+        """Deploy the validated version and finish the report"""
+        # Step 6: Deploy if validation passed
+        if should_deploy:
+            logging.info("Validation passed, deploying model...")
+            deployment_success = self.model_deployer.deploy_model(version)
+            report['steps']['deployed'] = deployment_success
+            
+            if deployment_success:
+                logging.info(f"Successfully deployed model version {version}")
+                report['success'] = True
+            else:
+                logging.error("Deployment failed")
+        else:
+            logging.warning("Validation failed, model not deployed")
+            report['steps']['deployed'] = False
+            report['steps']['rejection_reason'] = report['steps']['validation'].get('reason', [])
+        
+        logging.info("="*50)
+        logging.info("Pipeline execution completed")
+        logging.info("="*50)
+        
+        return report
+    
+    def tune_hyperparameters(self, X, y, train_idx):
+        """
+        Reuse the cached tuning result unless the data has shifted, else search
+        
+        Args:
+            X: Feature matrix
+            y: Binary labels
+            train_idx: Training row positions
+            
+        Returns:
+            dict: Tuning result with best_params, data_profile and reused flag
+        """
+        profile = data_profile(X, y, train_idx)
+        cached = self.model_trainer.get_cached_tuning()
+        if cached is not None and cached.get('data_profile'):
+            shifted, reasons = data_shifted(cached['data_profile'], profile)
+            if not shifted:
+                logging.info("Data unchanged since last tuning, reusing cached parameters")
+                return {**cached, 'reused': True}
+            logging.info(f"Re-tuning: {'; '.join(reasons)}")
+        
+        tuner = HyperparameterTuner(estimator=self.model_trainer.estimator)
+        tuning = tuner.search(X, y, train_idx)
+        tuning['data_profile'] = profile
+        tuning['reused'] = False
+        logging.info(f"Tuned parameters: {tuning['best_params']} (AUC {tuning['best_score']:.4f})")
+        return tuning
+    
+    def enable_drift_monitoring(self, psi_threshold=PSI_MAJOR, min_rows=5000,
+                                cooldown_seconds=6 * 3600, poll_minutes=5):
+        """
+        Monitor live scoring traffic and retrain early on drift
+        
+        Switches on drift recording in every scoring process (dashboard,
+        scoring service, batch workers): each writes per-feature and score
+        histograms, binned against the active model's reference profile, to
+        models/drift. Every poll_minutes the scheduler loop sums them; when
+        a feature or the score distribution crosses psi_threshold,
+        trigger_early_retraining runs the pipeline without waiting for the
+        schedule.
+        
+        Args:
+            psi_threshold: PSI that counts as drift
+            min_rows: Rows scored before drift is evaluated
+            cooldown_seconds: Minimum time between drift-triggered runs
+            poll_minutes: How often run_scheduler checks the recorded counts
+            
+        Returns:
+            SharedDriftMonitor
+        """
+        set_recording(self.drift_state_dir, True)
+        monitor = SharedDriftMonitor(
+            profile_path=self.model_deployer.active_profile_path,
+            state_dir=self.drift_state_dir,
+            psi_threshold=psi_threshold,
+            min_rows=min_rows,
+            cooldown_seconds=cooldown_seconds,
+            on_drift=self.trigger_early_retraining
+        )
+        schedule.every(poll_minutes).minutes.do(self._check_drift, monitor)
+        logging.info(f"Drift monitoring enabled (PSI > {psi_threshold}, min {min_rows} rows, "
+                     f"checked every {poll_minutes} min)")
+        return monitor
+    
+    def _check_drift(self, monitor):
+        try:
+            monitor.check()
+        except Exception as e:
+            # A bad count file must not stop the scheduler loop
+            logging.error(f"Drift check failed: {str(e)}")
+    
+    def disable_drift_monitoring(self):
+        """Stop drift recording in the scoring processes"""
+        set_recording(self.drift_state_dir, False)
+        logging.info("Drift monitoring disabled")
+    
+    def trigger_early_retraining(self, status=None):
+        """
+        Start a pipeline run in the background, unless one is already running
+        
+        The run retrains on data staged since the last run; with nothing
+        staged it is skipped like a scheduled run.
+        
+        Args:
+            status: Drift status that caused the trigger (logged)
+            
+        Returns:
+            threading.Thread or None
+        """
+        if self._pipeline_lock.locked():
+            logging.info("Early retraining requested, but a pipeline run is in progress")
+            return None
+        if status is not None:
+            logging.warning(
+                f"Early retraining triggered by drift: max PSI {status['max_psi']:.3f}, "
+                f"features {status['drifted_features']}"
+            )
+        thread = threading.Thread(
+            target=self.run_pipeline, kwargs={'trigger': 'drift'},
+            name='early-retraining', daemon=True
+        )
+        thread.start()
+        return thread
+    
+    def enable_shadow_scoring(self, version):
+        """
+        Score live batches with a candidate version next to the active model
+        
+        Writes models/shadow/control.json. Every scoring process (dashboard,
+        scoring service, batch workers) picks it up within a few seconds and
+        hands each batch it scores to a background ShadowScorer. Score deltas
+        and tier flips are written per process to models/shadow/shadow_vX_Y/,
+        where ModelValidator sums them as promotion evidence.
+        
+        Args:
+            version: Candidate version (trained, not deployed)
+        """
+        model_path = os.path.join(
+            self.model_trainer.versions_dir, f"model_v{version.replace('.', '_')}.pkl"
+        )
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Model version {version} not found")
+        set_shadow_version(self.shadow_dir, version)
+        logging.info(f"Shadow scoring enabled for version {version}")
+    
+    def disable_shadow_scoring(self):
+        """
+        Stop shadow scoring in every scoring process
+        
+        Returns:
+            dict: Shadow aggregates against the current active model so far,
+                or None if shadow scoring was off
+        """
+        version = shadow_version(self.shadow_dir)
+        if version is None:
+            return None
+        set_shadow_version(self.shadow_dir, None)
+        logging.info(f"Shadow scoring stopped for version {version}")
+        active_model_path = self.model_deployer.active_model_path
+        if not os.path.exists(active_model_path):
+            return None
+        return load_shadow_summary(self.shadow_dir, version, file_hash(active_model_path))
+    
+    def promote_shadow_candidate(self, version):
+        """
+        Validate a shadowed candidate on the stored test split and deploy it if it passes
+        
+        Validation includes the shadow evidence gathered on live traffic.
+        
+        Args:
+            version: Candidate version
+            
+        Returns:
+            tuple: (deployed: bool, validation report dict)
+        """
+        with self._pipeline_lock:
+            if shadow_version(self.shadow_dir) == version:
+                self.disable_shadow_scoring()
+            test_set = self.feature_store.load_test_set()
+            if test_set is None:
+                return False, {'error': 'No stored test split; run the pipeline first'}
+            X_test, y_test = test_set
+            should_deploy, report = self.model_validator.validate_model(
+                version, self.model_trainer.as_frame(X_test), y_test
+            )
+            if not should_deploy:
+                logging.warning(f"Shadow candidate {version} not promoted: {report.get('reason')}")
+                return False, report
+            return self.model_deployer.deploy_model(version), report
+    
+    def schedule_daily(self, time_str="02:00", training_mode='full', candidates=None):
         """
         Schedule daily retraining at specified time
         
         Args:
             time_str: Time in HH:MM format (24-hour)
+            training_mode: 'full' or 'warm_start'
+            candidates: Optional candidate specs for champion/challenger runs
         """
-        logging.info(f"Scheduling daily retraining at {time_str}")
-        schedule.every().day.at(time_str).do(self.run_pipeline)
+        logging.info(f"Scheduling daily {training_mode} retraining at {time_str}")
+        schedule.every().day.at(time_str).do(
+            self.run_pipeline, training_mode=training_mode, candidates=candidates
+        )
         
-    def schedule_weekly(self, day="monday", time_str="02:00"):
+    def schedule_weekly(self, day="monday", time_str="02:00", training_mode='full', candidates=None):
         """
         Schedule weekly retraining
         
         Args:
             day: Day of week
             time_str: Time in HH:MM format
+            training_mode: 'full' or 'warm_start'
+            candidates: Optional candidate specs for champion/challenger runs
         """
-        logging.info(f"Scheduling weekly retraining on {day} at {time_str}")
-        getattr(schedule.every(), day.lower()).at(time_str).do(self.run_pipeline)
+        logging.info(f"Scheduling weekly {training_mode} retraining on {day} at {time_str}")
+        getattr(schedule.every(), day.lower()).at(time_str).do(
+            self.run_pipeline, training_mode=training_mode, candidates=candidates
+        )
     
     def run_scheduler(self):
         """
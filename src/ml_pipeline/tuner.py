@@ -0,0 +1,206 @@
+"""
+Hyperparameter Tuner Module
+Successive-halving search over the trainer's estimator parameters, run on a
+process pool within a wall-clock budget
+"""
+
+import math
+import time
+import logging
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import ParameterSampler, train_test_split
+
+from .model_trainer import build_estimator
+
+logging.basicConfig(
+    filename='logs/retraining.log',
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Candidate values per estimator in the ESTIMATORS registry
+SEARCH_SPACES = {
+    'random_forest': {
+        'max_depth': [6, 8, 10, 12, 16, None],
+        'min_samples_split': [2, 5, 10, 20],
+        'min_samples_leaf': [1, 2, 5, 10],
+        'max_features': ['sqrt', 0.5, 0.8]
+    },
+    'hist_gradient_boosting': {
+        'learning_rate': [0.03, 0.05, 0.1, 0.2],
+        'max_leaf_nodes': [15, 31, 63, 127],
+        'min_samples_leaf': [20, 50, 100, 200],
+        'l2_regularization': [0.0, 0.1, 1.0, 10.0]
+    }
+}
+
+# A cached configuration is reused unless the data moved past these limits
+PROFILE_SAMPLE_ROWS = 100000
+MAX_ROW_GROWTH = 1.5
+MAX_POSITIVE_RATE_SHIFT = 0.02
+MAX_MEAN_SHIFT_STD = 0.2
+
+def data_profile(X, y, rows=None, random_state=42):
+    """
+    Summary of the training data used to decide whether to re-tune
+
+    Args:
+        X: Feature matrix
+        y: Binary labels
+        rows: Row positions to profile (all rows if None)
+        random_state: Random seed for the sample
+
+    Returns:
+        dict: rows, positive_rate, per-feature mean and std
+    """
+    rows = np.arange(len(y)) if rows is None else np.asarray(rows)
+    n_rows = len(rows)
+    if n_rows > PROFILE_SAMPLE_ROWS:
+        rows = np.sort(np.random.default_rng(random_state).choice(rows, PROFILE_SAMPLE_ROWS, replace=False))
+    sample = np.asarray(X[rows], dtype=np.float64)
+    return {
+        'rows': int(n_rows),
+        'positive_rate': float(np.mean(y[rows])),
+        'mean': np.nanmean(sample, axis=0).tolist(),
+        'std': np.nanstd(sample, axis=0).tolist()
+    }
+
+def data_shifted(previous, current):
+    """
+    Check whether the data changed enough to invalidate tuned parameters
+
+    Returns:
+        tuple: (bool, list of reasons)
+    """
+    reasons = []
+    growth = current['rows'] / max(previous['rows'], 1)
+    if growth > MAX_ROW_GROWTH or growth < 1 / MAX_ROW_GROWTH:
+        reasons.append(f"Row count changed {previous['rows']} -> {current['rows']}")
+    if abs(current['positive_rate'] - previous['positive_rate']) > MAX_POSITIVE_RATE_SHIFT:
+        reasons.append(
+            f"Positive rate changed {previous['positive_rate']:.3f} -> {current['positive_rate']:.3f}"
+        )
+    for j, (old_mean, new_mean, old_std) in enumerate(
+        zip(previous['mean'], current['mean'], previous['std'])
+    ):
+        if abs(new_mean - old_mean) > MAX_MEAN_SHIFT_STD * max(old_std, 1e-9):
+            reasons.append(f"Feature {j} mean shifted {old_mean:.3f} -> {new_mean:.3f}")
+    return bool(reasons), reasons
+
+def _evaluate_candidate(estimator, params, X, y, fit_rows, val_rows, random_state):
+    """Fit one configuration on fit_rows and return its validation AUC"""
+    extra = {'n_jobs': 1} if estimator == 'random_forest' else {}
+    model = build_estimator(estimator, random_state, **params, **extra)
+    model.fit(X[fit_rows], y[fit_rows])
+    return roc_auc_score(y[val_rows], model.predict_proba(X[val_rows])[:, 1])
+
+class HyperparameterTuner:
+    def __init__(self, estimator='random_forest', n_candidates=27, min_rows=20000,
+                 factor=3, time_budget_seconds=1800, n_jobs=-1, random_state=42):
+        """
+        Args:
+            estimator: ESTIMATORS registry key
+            n_candidates: Configurations sampled for the first round
+            min_rows: Training rows per candidate in the first round
+            factor: Each round keeps 1/factor of the candidates and gives
+                them factor times more rows
+            time_budget_seconds: Wall-clock limit for the whole search
+            n_jobs: Worker processes (-1 for all cores)
+            random_state: Random seed
+        """
+        if estimator not in SEARCH_SPACES:
+            raise ValueError(f"No search space for estimator '{estimator}'")
+        self.estimator = estimator
+        self.n_candidates = n_candidates
+        self.min_rows = min_rows
+        self.factor = factor
+        self.time_budget_seconds = time_budget_seconds
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+
+    def search(self, X, y, train_idx):
+        """
+        Run successive halving on the training rows
+
+        Candidates are scored by AUC on a held-out part of each round's row
+        sample. After every round the weakest are pruned. The search stops
+        early when one candidate is left, all training rows are in use, or
+        the next round would exceed the time budget. Memory-mapped X is
+        passed to the workers by reference, not copied.
+
+        Args:
+            X: Feature matrix (may be a memory map)
+            y: Binary labels
+            train_idx: Row positions the search may use (never the test set)
+
+        Returns:
+            dict: best_params, best_score, rounds, elapsed_seconds, stopped
+        """
+        start = time.perf_counter()
+        rng = np.random.default_rng(self.random_state)
+        candidates = list(ParameterSampler(
+            SEARCH_SPACES[self.estimator], self.n_candidates, random_state=self.random_state
+        ))
+        n_rows = min(self.min_rows, len(train_idx))
+        rounds = []
+        stopped = 'single_candidate'
+        best_params, best_score = candidates[0], None
+
+        with Parallel(n_jobs=self.n_jobs, backend='loky') as parallel:
+            while True:
+                round_start = time.perf_counter()
+                rows = np.sort(rng.choice(train_idx, n_rows, replace=False))
+                fit_rows, val_rows = train_test_split(
+                    rows, test_size=0.25, random_state=self.random_state, stratify=y[rows]
+                )
+                scores = parallel(
+                    delayed(_evaluate_candidate)(
+                        self.estimator, params, X, y, fit_rows, val_rows, self.random_state
+                    )
+                    for params in candidates
+                )
+                round_seconds = time.perf_counter() - round_start
+
+                order = np.argsort(scores)[::-1]
+                best_params, best_score = candidates[order[0]], float(scores[order[0]])
+                rounds.append({
+                    'candidates': len(candidates),
+                    'rows': int(n_rows),
+                    'best_score': best_score,
+                    'seconds': round(round_seconds, 2)
+                })
+                logging.info(
+                    f"Tuning round {len(rounds)}: {len(candidates)} candidates on {n_rows} rows, "
+                    f"best AUC {best_score:.4f} in {round_seconds:.1f}s"
+                )
+
+                if len(candidates) <= 1:
+                    break
+                if n_rows >= len(train_idx):
+                    stopped = 'all_rows_used'
+                    break
+
+                # Prune, then check the next round fits in the budget
+                keep = max(1, math.ceil(len(candidates) / self.factor))
+                if keep == 1:
+                    break
+                next_rows = min(n_rows * self.factor, len(train_idx))
+                projected = round_seconds * (keep / len(candidates)) * (next_rows / n_rows)
+                if time.perf_counter() - start + projected > self.time_budget_seconds:
+                    stopped = 'time_budget'
+                    logging.info("Tuning stopped early: next round would exceed the time budget")
+                    break
+                candidates = [candidates[i] for i in order[:keep]]
+                n_rows = next_rows
+
+        return {
+            'estimator': self.estimator,
+            'best_params': best_params,
+            'best_score': best_score,
+            'rounds': rounds,
+            'elapsed_seconds': round(time.perf_counter() - start, 2),
+            'stopped': stopped
+        }
@@ -0,0 +1,47 @@
+"""
+Batch Scoring Script
+Score a portfolio CSV of any size with the active model
+"""
+
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.batch_scorer import score_file, DEFAULT_CHUNKSIZE
+
+def main():
+    parser = argparse.ArgumentParser(description='Score a portfolio CSV with the active model')
+    parser.add_argument('input', type=str, help='Portfolio CSV to score')
+    parser.add_argument('output', type=str, help='Output CSV with risk_score and risk_tier')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                        help=f'Rows per chunk (default: {DEFAULT_CHUNKSIZE})')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Scoring processes; 0 = one per CPU core (default: 1)')
+    args = parser.parse_args()
+
+    print("="*60)
+    print("BATCH SCORING")
+    print("="*60)
+
+    def progress(rows, elapsed):
+        print(f"  {rows:,} rows scored ({rows / elapsed:,.0f} rows/sec)")
+
+    workers = args.workers or os.cpu_count() or 1
+    result = score_file(args.input, args.output, chunksize=args.chunksize,
+                        workers=workers, progress=progress)
+
+    print(f"\nRows: {result['rows']:,}")
+    print(f"Chunks: {result['chunks']}")
+    if result['error_chunks']:
+        print(f"Failed chunks (not written): {result['error_chunks']} "
+              f"({result['error_rows']:,} rows)")
+    print(f"Workers: {result['workers']}")
+    print(f"Time: {result['seconds']:.2f}s")
+    print(f"Throughput: {result['rows_per_sec']:,.0f} rows/sec")
+    print(f"Output: {args.output}")
+    print("\n" + "="*60)
+
+if __name__ == "__main__":
+    main()
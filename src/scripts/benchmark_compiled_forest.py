@@ -0,0 +1,89 @@
+"""
+Compiled Forest Benchmark
+Checks probability parity and compares latency of the compiled forest
+against sklearn's predict_proba
+"""
+
+import sys
+import os
+import argparse
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.compiled_forest import CompiledForest
+
+FEATURES = ['utilisation_pct', 'avg_payment_ratio', 'min_due_paid_frequency',
+            'merchant_mix_index', 'cash_withdrawal_pct', 'recent_spend_change_pct']
+
+def load_or_train_model(model_path, data_path):
+    if model_path and os.path.exists(model_path):
+        print(f"Using model: {model_path}")
+        return joblib.load(model_path)
+
+    print(f"Training benchmark forest on {data_path}")
+    df = pd.read_csv(data_path)
+    model = RandomForestClassifier(
+        n_estimators=100, max_depth=10, min_samples_split=5, min_samples_leaf=2,
+        class_weight='balanced', random_state=42
+    )
+    return model.fit(df[FEATURES].to_numpy(), (df['dpd_bucket_next_month'] > 0).astype(int))
+
+def latency_ms(func, X, repeats):
+    func(X)  # Warm up
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(X)
+        times.append((time.perf_counter() - start) * 1000)
+    return np.median(times)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the compiled forest predictor')
+    parser.add_argument('--model', type=str, default='models/active/model.pkl',
+                        help='Pickled forest to compile (trains one if missing)')
+    parser.add_argument('--data', type=str, default='data/sample_data.csv',
+                        help='Data used when a benchmark forest has to be trained')
+    parser.add_argument('--repeats', type=int, default=50)
+    args = parser.parse_args()
+
+    print("="*60)
+    print("COMPILED FOREST BENCHMARK")
+    print("="*60)
+
+    model = load_or_train_model(args.model, args.data)
+    model.n_jobs = 1  # Compare single-threaded evaluation
+
+    start = time.perf_counter()
+    compiled = CompiledForest.from_sklearn(model)
+    print(f"Compiled {compiled.n_estimators} trees, {len(compiled.feature):,} nodes "
+          f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # Parity on random inputs spanning the feature ranges
+    rng = np.random.default_rng(42)
+    X = rng.uniform(-50, 150, size=(100000, compiled.n_features_in_))
+    expected = model.predict_proba(X)
+    actual = compiled.predict_proba(X)
+    identical = np.array_equal(expected, actual)
+    print(f"\nParity on {len(X):,} rows: {'IDENTICAL' if identical else 'MISMATCH'} "
+          f"(max abs diff {np.abs(expected - actual).max():.2e})")
+
+    print(f"\n{'Rows':>8} {'sklearn (ms)':>14} {'compiled (ms)':>14} {'speedup':>9}")
+    for n_rows in [1, 10, 100, 1000, 10000]:
+        batch = X[:n_rows]
+        repeats = args.repeats if n_rows <= 1000 else max(3, args.repeats // 10)
+        sk_ms = latency_ms(model.predict_proba, batch, repeats)
+        cf_ms = latency_ms(compiled.predict_proba, batch, repeats)
+        print(f"{n_rows:>8} {sk_ms:>14.3f} {cf_ms:>14.3f} {sk_ms / cf_ms:>8.1f}x")
+
+    print("\n" + "="*60)
+    if not identical:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Estimator Benchmark
+Compares the ModelTrainer estimators on train time, model size, scoring
+latency and AUC over a synthetic portfolio
+"""
+
+import sys
+import os
+import argparse
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from sklearn.metrics import roc_auc_score
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.makedirs('logs', exist_ok=True)
+
+from ml_pipeline.model_trainer import ESTIMATORS, ModelTrainer, build_estimator, model_size
+
+def make_features(n_rows, rng):
+    """Synthetic features with a learnable default signal, in FEATURE_COLUMNS order"""
+    utilisation = rng.integers(0, 100, n_rows)
+    payment = rng.integers(0, 100, n_rows)
+    min_due = rng.integers(0, 100, n_rows)
+    merchant = rng.random(n_rows).round(2)
+    cash = rng.integers(0, 50, n_rows)
+    spend = rng.integers(-50, 50, n_rows)
+    logit = (utilisation - 50) / 15 - (payment - 50) / 20 + (cash - 25) / 15 + rng.normal(0, 1, n_rows)
+    X = np.column_stack([utilisation, payment, min_due, merchant, cash, spend]).astype(np.float32)
+    return X, (logit > 1.0).astype(np.int8)
+
+def latency_ms(func, X, repeats):
+    func(X)  # Warm up
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(X)
+        times.append((time.perf_counter() - start) * 1000)
+    return np.median(times)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ModelTrainer estimators')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeats', type=int, default=50)
+    parser.add_argument('--estimators', nargs='+', default=list(ESTIMATORS),
+                        choices=list(ESTIMATORS))
+    args = parser.parse_args()
+
+    print("="*60)
+    print("ESTIMATOR BENCHMARK")
+    print("="*60)
+
+    trainer = ModelTrainer()
+    rng = np.random.default_rng(42)
+    X, y = make_features(args.rows, rng)
+    train_idx, test_idx = trainer.split_indices(y)
+    X_train, y_train = trainer.as_frame(X[train_idx]), y[train_idx]
+    X_test, y_test = trainer.as_frame(X[test_idx]), y[test_idx]
+    print(f"\nRows: {args.rows:,} (train {len(train_idx):,}, test {len(test_idx):,})")
+
+    results = []
+    for name in args.estimators:
+        model = build_estimator(name)
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        train_seconds = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'model.pkl')
+            joblib.dump(model, path)
+            size_mb = os.path.getsize(path) / 1e6
+
+        auc = roc_auc_score(y_test, model.predict_proba(X_test)[:, 1])
+        single_ms = latency_ms(model.predict_proba, X_test.iloc[:1], args.repeats)
+        batch_ms = latency_ms(model.predict_proba, X_test.iloc[:10000], max(3, args.repeats // 10))
+        results.append((name, model_size(model), train_seconds, size_mb, single_ms, batch_ms, auc))
+
+    print(f"\n{'Estimator':<24} {'Size':>6} {'Train (s)':>10} {'Model (MB)':>11} "
+          f"{'1 row (ms)':>11} {'10k rows (ms)':>14} {'AUC':>7}")
+    for name, n, train_seconds, size_mb, single_ms, batch_ms, auc in results:
+        print(f"{name:<24} {n:>6} {train_seconds:>10.2f} {size_mb:>11.2f} "
+              f"{single_ms:>11.2f} {batch_ms:>14.1f} {auc:>7.4f}")
+    print("\nSize is trees (random forest) or boosting iterations.")
+    print("\n" + "="*60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Incremental Merge Benchmark
+Compares a full master rewrite with the incremental delta-segment merge, on
+the path run_pipeline takes (merge, then load the whole master)
+"""
+
+import sys
+import os
+import argparse
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.makedirs('logs', exist_ok=True)
+
+from ml_pipeline.data_manager import DataManager
+
+def make_portfolio(n_rows, id_offset, n_ids, rng):
+    """Synthetic rows with customer IDs drawn from [id_offset, id_offset + n_ids)"""
+    ids = id_offset + rng.permutation(n_ids)[:n_rows] if n_rows <= n_ids \
+        else id_offset + rng.integers(0, n_ids, n_rows)
+    return pd.DataFrame({
+        'customer_id': pd.Series(ids).map('C{:09d}'.format),
+        'credit_limit': rng.integers(20, 500, n_rows) * 1000,
+        'utilisation_pct': rng.integers(0, 100, n_rows),
+        'avg_payment_ratio': rng.integers(0, 100, n_rows),
+        'min_due_paid_frequency': rng.integers(0, 100, n_rows),
+        'merchant_mix_index': rng.random(n_rows).round(2),
+        'cash_withdrawal_pct': rng.integers(0, 50, n_rows),
+        'recent_spend_change_pct': rng.integers(-50, 50, n_rows),
+        'dpd_bucket_next_month': rng.choice([0, 0, 0, 1, 2, 3], n_rows)
+    })
+
+def make_manager(root):
+    dm = DataManager()
+    dm.new_data_dir = os.path.join(root, 'new')
+    dm.archive_dir = os.path.join(root, 'archive')
+    dm.training_data_dir = os.path.join(root, 'training')
+    dm.master_dataset_path = os.path.join(dm.training_data_dir, 'master_dataset.csv')
+    dm.master_parquet_path = os.path.join(dm.training_data_dir, 'master_dataset.parquet')
+    dm.delta_dir = os.path.join(dm.training_data_dir, 'deltas')
+    for d in [dm.new_data_dir, dm.archive_dir, dm.training_data_dir]:
+        os.makedirs(d, exist_ok=True)
+    return dm
+
+def full_rewrite(dm, delta_path):
+    """Previous behaviour: read everything, concat, dedupe, sort, rewrite"""
+    master_df = dm._read_master()
+    combined = pd.concat([master_df, pd.read_csv(delta_path)], ignore_index=True)
+    return dm._write_master(dm._clean_data(combined))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark incremental master merge')
+    parser.add_argument('--master-rows', type=int, default=50_000_000)
+    parser.add_argument('--delta-rows', type=int, default=100_000)
+    parser.add_argument('--workdir', type=str, default=None,
+                        help='Scratch directory (default: a temporary directory)')
+    args = parser.parse_args()
+
+    print("="*60)
+    print("INCREMENTAL MERGE BENCHMARK")
+    print("="*60)
+
+    root = args.workdir or tempfile.mkdtemp(prefix='merge_bench_')
+    rng = np.random.default_rng(42)
+
+    try:
+        print(f"\nBuilding {args.master_rows:,}-row master...")
+        dm = make_manager(root)
+        dm._write_master(dm._clean_data(make_portfolio(args.master_rows, 0, args.master_rows, rng)))
+
+        # Half the delta updates existing customers, half adds new ones
+        half = args.delta_rows // 2
+        delta = pd.concat([
+            make_portfolio(half, 0, args.master_rows, rng),
+            make_portfolio(args.delta_rows - half, args.master_rows, args.delta_rows, rng)
+        ], ignore_index=True)
+        delta_path = os.path.join(root, 'delta.csv')
+        delta.to_csv(delta_path, index=False)
+
+        base_copy = dm.master_parquet_path + '.orig'
+        shutil.copy2(dm.master_parquet_path, base_copy)
+
+        print(f"Merging {args.delta_rows:,}-row delta...")
+        start = time.perf_counter()
+        full_rows = len(full_rewrite(dm, delta_path))
+        full_seconds = time.perf_counter() - start
+
+        shutil.copy2(base_copy, dm.master_parquet_path)
+        shutil.copy2(delta_path, os.path.join(dm.new_data_dir, 'delta.csv'))
+        start = time.perf_counter()
+        # Same call as the scheduler: merge, then return the whole master
+        incremental_rows = len(dm.merge_and_clean_data())
+        incremental_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        dm.get_training_data()
+        read_seconds = time.perf_counter() - start
+
+        print(f"\nFull rewrite + load:      {full_seconds:.2f}s")
+        print(f"Incremental merge + load: {incremental_seconds:.2f}s")
+        print(f"Speedup:                  {full_seconds / incremental_seconds:.1f}x")
+        print(f"Later master reads:       {read_seconds:.2f}s")
+        print(f"Rows after merge:         {full_rows:,} (full) / {incremental_rows:,} (incremental)")
+
+    finally:
+        if not args.workdir:
+            shutil.rmtree(root, ignore_errors=True)
+
+    print("\n" + "="*60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Model Format Benchmark
+Compares file size and load time of plain and compressed joblib pickles
+with the memory-mapped flat forest format
+"""
+
+import sys
+import os
+import argparse
+import shutil
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.makedirs('logs', exist_ok=True)
+
+from ml_pipeline.model_trainer import ModelTrainer, build_estimator
+from scripts.benchmark_estimators import make_features
+from utils.compiled_forest import CompiledForest
+
+def path_size(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
+
+def load_ms(loader, path, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        loader(path)
+        times.append((time.perf_counter() - start) * 1000)
+    return np.median(times)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark model serialization formats')
+    parser.add_argument('--model', type=str, default=None,
+                        help='Pickled forest to benchmark (trains one if omitted)')
+    parser.add_argument('--rows', type=int, default=200000,
+                        help='Synthetic rows when a forest has to be trained')
+    parser.add_argument('--compress', type=int, default=3, help='joblib zlib level')
+    parser.add_argument('--repeats', type=int, default=10)
+    args = parser.parse_args()
+
+    print("="*60)
+    print("MODEL FORMAT BENCHMARK")
+    print("="*60)
+
+    if args.model:
+        print(f"\nUsing model: {args.model}")
+        model = joblib.load(args.model)
+    else:
+        print(f"\nTraining benchmark forest on {args.rows:,} synthetic rows")
+        X, y = make_features(args.rows, np.random.default_rng(42))
+        model = build_estimator('random_forest').fit(ModelTrainer().as_frame(X), y)
+
+    root = tempfile.mkdtemp(prefix='format_bench_')
+    try:
+        plain_path = os.path.join(root, 'model.pkl')
+        compressed_path = os.path.join(root, 'model_compressed.pkl')
+        flat_path = os.path.join(root, 'model_compiled')
+        joblib.dump(model, plain_path)
+        joblib.dump(model, compressed_path, compress=args.compress)
+        CompiledForest.from_sklearn(model).save(flat_path)
+
+        formats = [
+            ('joblib', plain_path, joblib.load),
+            (f'joblib compress={args.compress}', compressed_path, joblib.load),
+            ('flat (mmap)', flat_path, CompiledForest.load)
+        ]
+
+        sample = np.zeros((1, model.n_features_in_), dtype=np.float32)
+        print(f"\n{'Format':<22} {'Size (MB)':>10} {'Load (ms)':>10} {'Load + 1 row (ms)':>18}")
+        for name, path, loader in formats:
+            load = load_ms(loader, path, args.repeats)
+            start = time.perf_counter()
+            loaded = loader(path)
+            if hasattr(loaded, 'feature_names_in_'):
+                loaded.predict_proba(ModelTrainer().as_frame(sample))
+            else:
+                loaded.predict_proba(sample)
+            first_ms = (time.perf_counter() - start) * 1000
+            print(f"{name:<22} {path_size(path) / 1e6:>10.2f} {load:>10.1f} {first_ms:>18.1f}")
+        print("\nLoad times are with the files in the OS page cache.")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print("\n" + "="*60)
+
+if __name__ == "__main__":
+    main()
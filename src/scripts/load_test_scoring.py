@@ -0,0 +1,126 @@
+"""
+Scoring Load Test
+Fire concurrent scoring requests and report latency percentiles
+"""
+
+import sys
+import os
+import argparse
+import json
+import threading
+import time
+import http.client
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.micro_batcher import DEFAULT_MAX_BATCH_ROWS, DEFAULT_MAX_WAIT_MS
+from utils.scoring_service import ScoringService
+
+def load_records(data_path):
+    df = pd.read_csv(data_path)
+    return df.to_dict(orient='records')
+
+def make_http_client(url):
+    """One keep-alive connection per load-test thread"""
+    parsed = urllib.parse.urlparse(url)
+    local = threading.local()
+
+    def send(batch):
+        if not hasattr(local, 'conn'):
+            local.conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80)
+        body = json.dumps(batch).encode('utf-8')
+        local.conn.request('POST', '/score', body=body,
+                           headers={'Content-Type': 'application/json'})
+        response = local.conn.getresponse()
+        payload = json.loads(response.read())
+        if response.status != 200:
+            raise RuntimeError(payload.get('error'))
+        return payload['results']
+
+    return send
+
+def run_load_test(send, records, n_requests, concurrency, batch_size):
+    """
+    Send n_requests batches from concurrency threads
+
+    Returns:
+        tuple: (latencies in ms, wall-clock seconds)
+    """
+    rng = np.random.default_rng(42)
+    batches = [
+        [records[i] for i in rng.integers(0, len(records), size=batch_size)]
+        for _ in range(n_requests)
+    ]
+
+    def timed(batch):
+        start = time.perf_counter()
+        send(batch)
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, batches))
+    return np.array(latencies), time.perf_counter() - start
+
+def print_report(latencies, wall_seconds, batch_size):
+    print(f"\nRequests: {len(latencies):,}")
+    print(f"Throughput: {len(latencies) / wall_seconds:,.0f} req/sec "
+          f"({len(latencies) * batch_size / wall_seconds:,.0f} rows/sec)")
+    for label, q in [('p50', 50), ('p90', 90), ('p99', 99), ('max', 100)]:
+        print(f"  {label}: {np.percentile(latencies, q):.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the scoring service')
+    parser.add_argument('--url', type=str, default=None,
+                        help='Service URL, e.g. http://127.0.0.1:8502 (default: score in-process)')
+    parser.add_argument('--data', type=str, default='data/sample_data.csv',
+                        help='CSV providing sample customer records')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--batch-size', type=int, default=1)
+    parser.add_argument('--compare-batching', action='store_true',
+                        help='In-process only: run with and without micro-batching')
+    parser.add_argument('--max-batch-rows', type=int, default=DEFAULT_MAX_BATCH_ROWS)
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    print("="*60)
+    print("SCORING LOAD TEST")
+    print("="*60)
+
+    records = load_records(args.data)
+    print(f"Concurrency: {args.concurrency}, batch size: {args.batch_size}")
+
+    if args.url:
+        print(f"\nTarget: {args.url}")
+        latencies, wall_seconds = run_load_test(
+            make_http_client(args.url), records, args.requests, args.concurrency, args.batch_size
+        )
+        print_report(latencies, wall_seconds, args.batch_size)
+    else:
+        modes = [False, True] if args.compare_batching else [False]
+        for batching in modes:
+            service = ScoringService(batching=batching, max_batch_rows=args.max_batch_rows,
+                                     max_wait_ms=args.max_wait_ms)
+            label = (f"micro-batching ({args.max_batch_rows} rows / {args.max_wait_ms} ms)"
+                     if batching else "direct")
+            print(f"\nTarget: in-process ScoringService, {label}")
+            latencies, wall_seconds = run_load_test(
+                service.score, records, args.requests, args.concurrency, args.batch_size
+            )
+            print_report(latencies, wall_seconds, args.batch_size)
+            if batching:
+                m = service.batcher.metrics()
+                print(f"  batches: {m['batches']:,}, mean size: {m['mean_batch_size']:.1f}, "
+                      f"mean queue wait: {m['mean_wait_ms']:.3f} ms")
+            service.close()
+
+    print("\n" + "="*60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Scoring Service Script
+Run the low-latency scoring API locally
+"""
+
+import sys
+import os
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.micro_batcher import DEFAULT_MAX_BATCH_ROWS, DEFAULT_MAX_WAIT_MS
+from utils.scoring_service import ScoringService, run_server
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve risk scores over HTTP')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Interface to bind')
+    parser.add_argument('--port', type=int, default=8502, help='Port to listen on')
+    parser.add_argument('--batching', action='store_true',
+                        help='Coalesce concurrent requests into micro-batches')
+    parser.add_argument('--max-batch-rows', type=int, default=DEFAULT_MAX_BATCH_ROWS,
+                        help=f'Largest micro-batch (default: {DEFAULT_MAX_BATCH_ROWS})')
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help=f'Longest wait for a micro-batch to fill (default: {DEFAULT_MAX_WAIT_MS})')
+    args = parser.parse_args()
+
+    service = ScoringService(batching=args.batching, max_batch_rows=args.max_batch_rows,
+                             max_wait_ms=args.max_wait_ms)
+    run_server(host=args.host, port=args.port, service=service)
+
+if __name__ == "__main__":
+    main()
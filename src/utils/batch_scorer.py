@@ -0,0 +1,156 @@
+"""
+Batch Scorer Module
+Streams large portfolio files through the risk engine chunk by chunk,
+optionally fanning chunks out to a pool of worker processes.
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.util import Finalize
+
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import REQUIRED_COLUMNS, iter_data_chunks, standardize_columns
+from utils.risk_engine import FEATURE_COLUMNS, calculate_risk_scores, flush_observers, load_active_model
+
+DEFAULT_CHUNKSIZE = 100000
+
+def _init_worker():
+    """
+    Load the active model once per worker process
+
+    The forest is pinned to one thread so N workers use N cores instead
+    of each worker fanning out to every core. When the pool shuts the
+    worker down, its drift counts and shadow aggregates are written once
+    (the shadow scorer first finishes its queue).
+    """
+    model = load_active_model()
+    if hasattr(model, 'n_jobs'):
+        model.n_jobs = 1
+    Finalize(None, flush_observers, kwargs={'wait': True}, exitpriority=10)
+
+def _score_chunk(chunk):
+    return calculate_risk_scores(chunk)
+
+def _check_columns(columns):
+    """Raise if columns (standardized) lack anything the model scores on"""
+    missing = [col for col in dict.fromkeys(REQUIRED_COLUMNS + FEATURE_COLUMNS) if col not in columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+def _failed(scored):
+    """True if calculate_risk_scores fell back to its 'Error' tier for the chunk"""
+    return (scored['risk_tier'].astype(str) == 'Error').any()
+
+def _make_pool(workers):
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+
+def score_file(input_path, output_path, chunksize=DEFAULT_CHUNKSIZE, workers=1, progress=None):
+    """
+    Score a CSV portfolio file in chunks and append results to output_path
+
+    Peak memory is bounded by the chunk size, not the file size. With
+    workers > 1 chunks are scored in a process pool; at most 2 * workers
+    chunks are in flight and output keeps the input row order.
+
+    A file without every model feature column is rejected before anything
+    is scored. A chunk the risk engine fails to score is left out of the
+    output and counted in error_chunks / error_rows instead of being
+    written with the engine's fallback score of 0.
+
+    Args:
+        input_path: Portfolio CSV to score
+        output_path: CSV file written incrementally with scores and tiers
+        chunksize: Rows per chunk
+        workers: Number of scoring processes (1 = score in this process)
+        progress: Optional callback(rows_done, elapsed_seconds) after each chunk
+
+    Returns:
+        dict: rows (written), chunks, error_chunks, error_rows, seconds and
+            rows_per_sec
+    """
+    # Fail fast (instead of writing 'Error' tiers) if there is no model
+    # or the file lacks model features
+    load_active_model()
+    _check_columns(standardize_columns(pd.read_csv(input_path, nrows=0)).columns)
+
+    if os.path.exists(output_path):
+        os.remove(output_path)
+
+    start = time.perf_counter()
+    rows = 0
+    chunks = 0
+    error_chunks = 0
+    error_rows = 0
+
+    def write(scored):
+        nonlocal rows, chunks, error_chunks, error_rows
+        chunks += 1
+        if _failed(scored):
+            error_chunks += 1
+            error_rows += len(scored)
+            return
+        scored.to_csv(output_path, mode='a', header=not os.path.exists(output_path), index=False)
+        rows += len(scored)
+        if progress is not None:
+            progress(rows, time.perf_counter() - start)
+
+    if workers <= 1:
+        for chunk in iter_data_chunks(input_path, chunksize=chunksize):
+            write(_score_chunk(chunk))
+    else:
+        with _make_pool(workers) as pool:
+            pending = deque()
+            for chunk in iter_data_chunks(input_path, chunksize=chunksize):
+                pending.append(pool.submit(_score_chunk, chunk))
+                if len(pending) >= 2 * workers:
+                    write(pending.popleft().result())
+            while pending:
+                write(pending.popleft().result())
+
+    seconds = time.perf_counter() - start
+    if workers <= 1:
+        # Once, after every result is written (pool workers do this when
+        # they shut down); scoring itself never waits for the shadow model
+        flush_observers(wait=True)
+    return {
+        'rows': rows,
+        'chunks': chunks,
+        'error_chunks': error_chunks,
+        'error_rows': error_rows,
+        'workers': workers,
+        'seconds': seconds,
+        'rows_per_sec': rows / seconds if seconds > 0 else 0.0
+    }
+
+def score_frame(df, workers=None):
+    """
+    Score an in-memory portfolio by sharding it across worker processes
+
+    Args:
+        df: Portfolio DataFrame
+        workers: Number of processes (default: all CPU cores)
+
+    Returns:
+        pd.DataFrame: Scored frame in the original row order (ValueError if
+            df lacks a model feature column)
+    """
+    if df is None or df.empty:
+        return None
+    _check_columns(df.columns)
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(df) < workers:
+        return calculate_risk_scores(df)
+
+    bounds = np.linspace(0, len(df), workers + 1, dtype=int)
+    shards = [df.iloc[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+    with _make_pool(workers) as pool:
+        # map() yields results in submission order
+        scored = list(pool.map(_score_chunk, shards))
+
+    return pd.concat(scored)
@@ -0,0 +1,225 @@
+"""
+Compiled Forest Module
+Flattens a fitted RandomForestClassifier into contiguous NumPy node arrays
+and evaluates it with vectorized traversal.
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+
+# Rows traversed per block; bounds the (rows x trees) node index matrix
+BLOCK_SIZE = 65536
+
+# Written last by save(), so its presence marks a complete directory
+MANIFEST_FILENAME = 'forest.json'
+ARRAY_NAMES = ['feature', 'threshold', 'left', 'right', 'missing_left', 'value', 'roots', 'classes']
+
+
+def compiled_path(root, source_hash):
+    """
+    Directory for the compiled form of the pickle with the given hash
+
+    Directories are content-addressed, so a deploy writes a new one instead
+    of overwriting files that scoring processes may have memory-mapped.
+    """
+    return os.path.join(root, source_hash[:16])
+
+
+class CompiledForest:
+    """
+    Array-based drop-in for RandomForestClassifier.predict_proba.
+
+    All trees are concatenated into one node table. Leaves point to
+    themselves, so every sample can be advanced max_depth times without
+    checking whether it already reached a leaf. Probabilities are accumulated
+    tree by tree in the same order and precision as scikit-learn, so results
+    are identical, not just close.
+    """
+
+    def __init__(self, feature, threshold, left, right, missing_left, value,
+                 roots, max_depth, classes, n_features, source_hash=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+        self.n_features_in_ = int(n_features)
+        self.source_hash = source_hash
+
+    @classmethod
+    def from_sklearn(cls, model, source_hash=None):
+        """
+        Compile a fitted RandomForestClassifier
+
+        Args:
+            model: Fitted RandomForestClassifier
+            source_hash: Optional hash of the pickle the model came from
+
+        Returns:
+            CompiledForest
+        """
+        # Exact types only: wrappers that forward estimators_ (e.g. a prior
+        # correction) change the probabilities and must not be compiled
+        if type(model) not in (RandomForestClassifier, ExtraTreesClassifier):
+            raise TypeError(f"Cannot compile {type(model).__name__}; expected a fitted forest")
+
+        features, thresholds, lefts, rights, missing, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes, dtype=np.int64) + offset
+            is_leaf = tree.children_left == -1
+
+            left = np.where(is_leaf, node_ids, tree.children_left + offset)
+            right = np.where(is_leaf, node_ids, tree.children_right + offset)
+            feature = np.where(is_leaf, 0, tree.feature)
+
+            # Same per-leaf normalization as DecisionTreeClassifier.predict_proba
+            proba = tree.value[:, 0, :model.n_classes_].astype(np.float64)
+            normalizer = proba.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+
+            features.append(feature)
+            thresholds.append(tree.threshold)
+            lefts.append(left)
+            rights.append(right)
+            missing.append(getattr(tree, 'missing_go_to_left', np.zeros(n_nodes, dtype=np.uint8)))
+            values.append(proba / normalizer)
+            roots.append(offset)
+
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.int32),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.int32),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=np.int32),
+            missing_left=np.ascontiguousarray(np.concatenate(missing), dtype=bool),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            classes=np.asarray(model.classes_),
+            n_features=model.n_features_in_,
+            source_hash=source_hash
+        )
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    def predict_proba(self, X):
+        """
+        Class probabilities, identical to the source forest's predict_proba
+
+        Args:
+            X: Array-like (n_samples, n_features)
+
+        Returns:
+            np.ndarray: (n_samples, n_classes)
+        """
+        # scikit-learn trees compare float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, model expects {self.n_features_in_}")
+
+        out = np.empty((X.shape[0], self.value.shape[1]), dtype=np.float64)
+        for start in range(0, X.shape[0], BLOCK_SIZE):
+            block = X[start:start + BLOCK_SIZE]
+            out[start:start + len(block)] = self._predict_block(block)
+        return out
+
+    def _predict_block(self, X):
+        n_samples = X.shape[0]
+        flat_x = np.ascontiguousarray(X).ravel()
+        row_offset = (np.arange(n_samples, dtype=np.int64) * X.shape[1])[:, None]
+        nodes = np.repeat(self.roots[None, :], n_samples, axis=0)
+        has_missing = np.isnan(flat_x).any()
+
+        for _ in range(self.max_depth):
+            x = flat_x.take(row_offset + self.feature.take(nodes))
+            go_left = x <= self.threshold.take(nodes)
+            if has_missing:
+                go_left |= np.isnan(x) & self.missing_left.take(nodes)
+            nodes = np.where(go_left, self.left.take(nodes), self.right.take(nodes))
+
+        # Accumulate tree by tree, as ForestClassifier.predict_proba does
+        proba = np.zeros((n_samples, self.value.shape[1]), dtype=np.float64)
+        for j in range(nodes.shape[1]):
+            proba += self.value[nodes[:, j]]
+        proba /= nodes.shape[1]
+        return proba
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def save(self, path):
+        """
+        Save node arrays as a directory of .npy files plus a JSON manifest
+
+        Each array is stored raw, so load() can memory-map it instead of
+        deserializing. The directory is written under a temporary name and
+        renamed into place.
+        """
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for name in ARRAY_NAMES:
+            array = self.classes_ if name == 'classes' else getattr(self, name)
+            np.save(os.path.join(tmp_path, f'{name}.npy'), np.ascontiguousarray(array))
+        manifest = {
+            'max_depth': self.max_depth,
+            'n_features': self.n_features_in_,
+            'n_estimators': self.n_estimators,
+            'source_hash': self.source_hash
+        }
+        with open(os.path.join(tmp_path, MANIFEST_FILENAME), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Load a forest saved with save()
+
+        Args:
+            path: Directory written by save(), or its manifest file
+            mmap: Memory-map the arrays read-only; pages are shared by every
+                process scoring with the same files
+
+        Returns:
+            CompiledForest
+        """
+        if os.path.basename(path) == MANIFEST_FILENAME:
+            path = os.path.dirname(path)
+        with open(os.path.join(path, MANIFEST_FILENAME), 'r') as f:
+            manifest = json.load(f)
+        mmap_mode = 'r' if mmap else None
+        arrays = {
+            name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode, allow_pickle=False)
+            for name in ARRAY_NAMES
+        }
+        return cls(
+            feature=arrays['feature'], threshold=arrays['threshold'],
+            left=arrays['left'], right=arrays['right'],
+            missing_left=arrays['missing_left'], value=arrays['value'],
+            roots=np.asarray(arrays['roots']), max_depth=manifest['max_depth'],
+            classes=np.asarray(arrays['classes']), n_features=manifest['n_features'],
+            source_hash=manifest['source_hash']
+        )
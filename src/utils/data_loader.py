@@ -1,6 +1,71 @@
 import pandas as pd
 import streamlit as st
 
+REQUIRED_COLUMNS = ['customer_id', 'utilisation_pct', 'avg_payment_ratio']
+
+def standardize_columns(df):
+    """
+    Standardize column names (lowercase, strip spaces, '%' -> 'pct')
+    
+    Standardized names will be:
+    customer_id, credit_limit, utilisation_pct, avg_payment_ratio, 
+    min_due_paid_frequency, merchant_mix_index, cash_withdrawal_pct, 
+    recent_spend_change_pct, dpd_bucket_next_month
+    """
+    df.columns = [c.strip().lower().replace(' ', '_').replace('%', 'pct') for c in df.columns]
+    return df
+
+def missing_required_columns(df):
+    """Return the required columns absent from df"""
+    return [col for col in REQUIRED_COLUMNS if col not in df.columns]
+
+def prepare_data(df):
+    """
+    Standardize names and coerce numeric columns of a raw frame
+    
+    Args:
+        df: DataFrame as read from CSV
+        
+    Returns:
+        pd.DataFrame: Same frame with standardized columns
+    """
+    df = standardize_columns(df)
+    
+    # Ensure data types
+    defaults = {
+        'utilisation_pct': 0,
+        'avg_payment_ratio': 100,
+        'cash_withdrawal_pct': 0,
+        'recent_spend_change_pct': 0
+    }
+    for col, default in defaults.items():
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(default)
+    
+    return df
+
+def iter_data_chunks(filepath, chunksize=100000):
+    """
+    Read a CSV in fixed-size chunks, prepared the same way as load_data
+    
+    Only one chunk is held in memory at a time, so files larger than RAM
+    can be processed.
+    
+    Args:
+        filepath: CSV path or file object
+        chunksize: Rows per chunk
+        
+    Yields:
+        pd.DataFrame: Prepared chunk
+    """
+    with pd.read_csv(filepath, chunksize=chunksize) as reader:
+        for chunk in reader:
+            chunk = prepare_data(chunk)
+            missing_cols = missing_required_columns(chunk)
+            if missing_cols:
+                raise ValueError(f"Missing required columns: {', '.join(missing_cols)}")
+            yield chunk
+
 def load_data(filepath):
     """
     Loads credit card data from a CSV file.
@@ -17,30 +82,13 @@ def load_data(filepath):
     - dpd_bucket_next_month
     """
     try:
-        df = pd.read_csv(filepath)
-        
-        # Standardize column names (lowercase, strip spaces)
-        df.columns = [c.strip().lower().replace(' ', '_').replace('%', 'pct') for c in df.columns]
-        
-        # Map to internal names if needed, or just use standardized names
-        # Standardized names will be:
-        # customer_id, credit_limit, utilisation_pct, avg_payment_ratio, 
-        # min_due_paid_frequency, merchant_mix_index, cash_withdrawal_pct, 
-        # recent_spend_change_pct, dpd_bucket_next_month
-        
-        required_columns = ['customer_id', 'utilisation_pct', 'avg_payment_ratio']
-        missing_cols = [col for col in required_columns if col not in df.columns]
+        df = prepare_data(pd.read_csv(filepath))
         
+        missing_cols = missing_required_columns(df)
         if missing_cols:
             st.error(f"Missing required columns: {', '.join(missing_cols)}")
             return None
             
-        # Ensure data types
-        df['utilisation_pct'] = pd.to_numeric(df['utilisation_pct'], errors='coerce').fillna(0)
-        df['avg_payment_ratio'] = pd.to_numeric(df['avg_payment_ratio'], errors='coerce').fillna(100)
-        df['cash_withdrawal_pct'] = pd.to_numeric(df['cash_withdrawal_pct'], errors='coerce').fillna(0)
-        df['recent_spend_change_pct'] = pd.to_numeric(df['recent_spend_change_pct'], errors='coerce').fillna(0)
-        
         return df
     except FileNotFoundError:
         st.error(f"File not found: {filepath}")
@@ -0,0 +1,345 @@
+"""
+Drift Monitor Module
+Online input and score drift tracking for batches scored by the risk engine.
+
+Scoring runs in several processes (the dashboard, the scoring service,
+batch workers), so each one records its histograms to a shared state
+directory and the scheduler aggregates them (SharedDriftMonitor).
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+import numpy as np
+
+from utils.drift_stats import PSI_MAJOR, bin_counts, ks, load_profile, psi
+from utils.model_registry import file_hash
+
+DEFAULT_PROFILE_PATH = 'models/active/reference_profile.json'
+DEFAULT_STATE_DIR = 'models/drift'
+CONTROL_FILENAME = 'control.json'
+
+
+def set_recording(state_dir, enabled):
+    """
+    Turn drift recording on or off in every scoring process
+
+    Scoring processes poll the control file (see risk_engine) and start or
+    stop recording on their own.
+    """
+    os.makedirs(state_dir, exist_ok=True)
+    path = os.path.join(state_dir, CONTROL_FILENAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'enabled': bool(enabled)}, f)
+    os.replace(tmp_path, path)
+
+
+def recording_enabled(state_dir):
+    try:
+        with open(os.path.join(state_dir, CONTROL_FILENAME), 'r') as f:
+            return bool(json.load(f).get('enabled'))
+    except (OSError, ValueError):
+        return False
+
+
+def drift_status(profile, counts, score_counts, rows, psi_threshold, min_rows):
+    """
+    PSI/KS of accumulated histograms against a reference profile
+
+    Returns:
+        dict: rows, per-feature and score psi/ks, max_psi, drifted_features, drifted
+    """
+    features = {
+        col: {
+            'psi': psi(ref['counts'], counts[col]),
+            'ks': ks(ref['counts'], counts[col])
+        }
+        for col, ref in profile['features'].items()
+    }
+    status = {'rows': int(rows), 'features': features, 'score': None}
+    if score_counts is not None and np.sum(score_counts) > 0:
+        reference = profile['score']['counts']
+        status['score'] = {
+            'psi': psi(reference, score_counts),
+            'ks': ks(reference, score_counts)
+        }
+
+    psis = [f['psi'] for f in features.values()]
+    if status['score'] is not None:
+        psis.append(status['score']['psi'])
+    status['max_psi'] = max(psis, default=0.0)
+    status['drifted_features'] = [
+        col for col, f in features.items() if f['psi'] > psi_threshold
+    ]
+    status['drifted'] = rows >= min_rows and status['max_psi'] > psi_threshold
+    return status
+
+
+class DriftMonitor:
+    """
+    Accumulates per-feature and score histograms of scored data.
+
+    Each batch is binned with the active model's reference edges and added
+    to running counts, so memory stays at O(features x bins) however much is
+    scored. When at least min_rows have been seen and a feature or the score
+    PSI crosses psi_threshold, on_drift(status) is called, at most once per
+    cooldown_seconds. A new reference profile (after a deploy) resets the
+    counts.
+
+    With state_dir set, the counts are also written to a per-process file
+    there at most every flush_seconds, for SharedDriftMonitor to aggregate.
+    """
+
+    def __init__(self, profile_path=DEFAULT_PROFILE_PATH, psi_threshold=PSI_MAJOR,
+                 min_rows=5000, cooldown_seconds=6 * 3600, on_drift=None,
+                 state_dir=None, flush_seconds=10):
+        """
+        Args:
+            profile_path: Active model's reference profile
+            psi_threshold: PSI above which a feature or the score has drifted
+            min_rows: Rows needed before drift is evaluated
+            cooldown_seconds: Minimum time between on_drift calls
+            on_drift: Callable receiving the status dict when drift is detected
+            state_dir: Optional shared directory for this process's counts
+            flush_seconds: Minimum time between writes to state_dir
+        """
+        self.profile_path = profile_path
+        self.psi_threshold = psi_threshold
+        self.min_rows = min_rows
+        self.cooldown_seconds = cooldown_seconds
+        self.on_drift = on_drift
+        self.state_dir = state_dir
+        self.flush_seconds = flush_seconds
+        self.state_path = None
+        if state_dir is not None:
+            # One file per process; started-at keeps a reused pid apart
+            self.state_path = os.path.join(
+                state_dir, f"counts_{socket.gethostname()}_{os.getpid()}_{int(time.time())}.json"
+            )
+
+        self._lock = threading.Lock()
+        self._profile = None
+        self._profile_hash = None
+        self._signature = None
+        self._counts = {}
+        self._score_counts = None
+        self._rows = 0
+        self._last_triggered = None
+        self._last_flush = time.monotonic()
+
+    def _refresh_reference(self):
+        """Reload the profile and reset the counts if the file changed"""
+        try:
+            stat = os.stat(self.profile_path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        if signature == self._signature:
+            return
+        self._signature = signature
+        self._profile = load_profile(self.profile_path) if signature else None
+        self._profile_hash = file_hash(self.profile_path) if self._profile is not None else None
+        self._reset_counts()
+
+    def _reset_counts(self):
+        self._rows = 0
+        if self._profile is None:
+            self._counts, self._score_counts = {}, None
+            return
+        self._counts = {
+            col: np.zeros(len(ref['edges']) + 2, dtype=np.int64)
+            for col, ref in self._profile['features'].items()
+        }
+        self._score_counts = np.zeros(len(self._profile['score']['edges']) + 2, dtype=np.int64)
+
+    def update(self, X, scores=None):
+        """
+        Add a scored batch
+
+        Args:
+            X: DataFrame with the reference profile's feature columns, or an
+                array with columns in the profile's order
+            scores: Optional model probabilities (0-1) for the rows of X
+
+        Returns:
+            dict: Current status if drift was detected (and on_drift called), else None
+        """
+        with self._lock:
+            self._refresh_reference()
+            if self._profile is None:
+                return None
+            for j, (col, ref) in enumerate(self._profile['features'].items()):
+                values = X[col].to_numpy() if hasattr(X, 'columns') else np.asarray(X)[:, j]
+                self._counts[col] += bin_counts(values, ref['edges'])
+            if scores is not None:
+                self._score_counts += bin_counts(scores, self._profile['score']['edges'])
+            self._rows += len(X)
+
+            if self.state_path is not None and time.monotonic() - self._last_flush >= self.flush_seconds:
+                self._persist()
+            if self.on_drift is None:
+                return None
+
+            status = self._status()
+            if not status['drifted']:
+                return None
+            now = time.monotonic()
+            if self._last_triggered is not None and now - self._last_triggered < self.cooldown_seconds:
+                return None
+            self._last_triggered = now
+            # Later drift is measured on data scored after this point
+            self._reset_counts()
+
+        logging.warning(f"Input drift detected: {status['drifted_features'] or 'score'} "
+                        f"(max PSI {status['max_psi']:.3f} over {status['rows']} rows)")
+        self.on_drift(status)
+        return status
+
+    def _persist(self):
+        """Write this process's counts (called with the lock held)"""
+        self._last_flush = time.monotonic()
+        state = {
+            'profile_hash': self._profile_hash,
+            'rows': self._rows,
+            'features': {col: counts.tolist() for col, counts in self._counts.items()},
+            'score': self._score_counts.tolist(),
+            'updated': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        os.makedirs(self.state_dir, exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def flush(self):
+        """Write the counts to state_dir now"""
+        with self._lock:
+            if self.state_path is not None and self._profile is not None:
+                self._persist()
+
+    def _status(self):
+        return drift_status(self._profile, self._counts, self._score_counts, self._rows,
+                            self.psi_threshold, self.min_rows)
+
+    def status(self):
+        """
+        Drift statistics of the data scored since the last reset
+
+        Returns:
+            dict: rows, per-feature and score psi/ks, max_psi, drifted_features,
+                drifted; None if there is no reference profile
+        """
+        with self._lock:
+            self._refresh_reference()
+            if self._profile is None:
+                return None
+            return self._status()
+
+    def reset(self):
+        with self._lock:
+            self._reset_counts()
+
+
+class SharedDriftMonitor:
+    """
+    Drift over everything the scoring processes recorded in state_dir.
+
+    check() sums the per-process count files written against the current
+    reference profile and calls on_drift(status) when drift is detected, at
+    most once per cooldown_seconds. After a trigger, later drift is measured
+    on rows recorded after that point. Count files of older profiles are
+    removed.
+    """
+
+    def __init__(self, profile_path=DEFAULT_PROFILE_PATH, state_dir=DEFAULT_STATE_DIR,
+                 psi_threshold=PSI_MAJOR, min_rows=5000, cooldown_seconds=6 * 3600,
+                 on_drift=None):
+        """
+        Args:
+            profile_path: Active model's reference profile
+            state_dir: Directory the scoring processes record to
+            psi_threshold: PSI above which a feature or the score has drifted
+            min_rows: Rows needed before drift is evaluated
+            cooldown_seconds: Minimum time between on_drift calls
+            on_drift: Callable receiving the status dict when drift is detected
+        """
+        self.profile_path = profile_path
+        self.state_dir = state_dir
+        self.psi_threshold = psi_threshold
+        self.min_rows = min_rows
+        self.cooldown_seconds = cooldown_seconds
+        self.on_drift = on_drift
+        self._profile_hash = None
+        self._baseline = None
+        self._last_triggered = None
+
+    def _totals(self, profile, profile_hash):
+        """Summed counts of every process file recorded against profile_hash"""
+        counts = {
+            col: np.zeros(len(ref['edges']) + 2, dtype=np.int64)
+            for col, ref in profile['features'].items()
+        }
+        score_counts = np.zeros(len(profile['score']['edges']) + 2, dtype=np.int64)
+        rows = 0
+        for filename in os.listdir(self.state_dir) if os.path.isdir(self.state_dir) else []:
+            if not (filename.startswith('counts_') and filename.endswith('.json')):
+                continue
+            path = os.path.join(self.state_dir, filename)
+            try:
+                with open(path, 'r') as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if state.get('profile_hash') != profile_hash:
+                os.remove(path)
+                continue
+            rows += state['rows']
+            for col in counts:
+                counts[col] += np.asarray(state['features'][col], dtype=np.int64)
+            score_counts += np.asarray(state['score'], dtype=np.int64)
+        return rows, counts, score_counts
+
+    def check(self):
+        """
+        Aggregate the recorded counts and trigger on drift
+
+        Returns:
+            dict: Drift status (see drift_status), or None without a reference profile
+        """
+        profile = load_profile(self.profile_path)
+        if profile is None:
+            return None
+        profile_hash = file_hash(self.profile_path)
+        rows, counts, score_counts = self._totals(profile, profile_hash)
+        if profile_hash != self._profile_hash:
+            self._profile_hash = profile_hash
+            self._baseline = None
+
+        if self._baseline is not None:
+            base_rows, base_counts, base_score = self._baseline
+            rows = max(rows - base_rows, 0)
+            counts = {col: np.maximum(c - base_counts[col], 0) for col, c in counts.items()}
+            score_counts = np.maximum(score_counts - base_score, 0)
+
+        status = drift_status(profile, counts, score_counts, rows,
+                              self.psi_threshold, self.min_rows)
+        if not status['drifted']:
+            return status
+        now = time.monotonic()
+        if self._last_triggered is not None and now - self._last_triggered < self.cooldown_seconds:
+            return status
+        self._last_triggered = now
+        # Later drift is measured on rows recorded after this point
+        self._baseline = self._totals(profile, profile_hash)
+
+        logging.warning(f"Input drift detected across scoring processes: "
+                        f"{status['drifted_features'] or 'score'} "
+                        f"(max PSI {status['max_psi']:.3f} over {status['rows']} rows)")
+        if self.on_drift is not None:
+            self.on_drift(status)
+        return status
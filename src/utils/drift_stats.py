@@ -0,0 +1,78 @@
+"""
+Drift Statistics Module
+Histogram, PSI and Kolmogorov-Smirnov helpers and reference profile I/O.
+
+Shared by scoring processes (utils.drift_monitor) and the training pipeline
+(ml_pipeline.drift). Depends on numpy only, so scoring never imports the
+training package.
+"""
+
+import json
+import os
+
+import numpy as np
+
+N_BINS = 10
+PSI_EPSILON = 1e-4
+
+# Conventional PSI reading: < 0.1 stable, 0.1-0.25 moderate, > 0.25 major shift
+PSI_MODERATE = 0.1
+PSI_MAJOR = 0.25
+
+def quantile_edges(values, n_bins=N_BINS):
+    """Interior bin edges at the reference quantiles (duplicates removed)"""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return []
+    edges = np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1])
+    return np.unique(edges).tolist()
+
+def bin_counts(values, edges):
+    """
+    Histogram of values over the bins defined by edges
+
+    Returns:
+        np.ndarray: len(edges) + 2 counts; the last one counts missing values
+    """
+    values = np.asarray(values, dtype=np.float64)
+    missing = np.isnan(values)
+    codes = np.searchsorted(np.asarray(edges, dtype=np.float64), values[~missing], side='right')
+    counts = np.bincount(codes, minlength=len(edges) + 1)
+    return np.append(counts, missing.sum())
+
+def psi(reference_counts, current_counts):
+    """Population stability index between two histograms over the same bins"""
+    expected = np.asarray(reference_counts, dtype=np.float64)
+    actual = np.asarray(current_counts, dtype=np.float64)
+    expected = np.maximum(expected / max(expected.sum(), 1), PSI_EPSILON)
+    actual = np.maximum(actual / max(actual.sum(), 1), PSI_EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+def ks(reference_counts, current_counts):
+    """
+    Two-sample KS statistic evaluated at the bin edges
+
+    A lower bound on the exact statistic; with decile bins it misses at most
+    the within-bin difference.
+    """
+    expected = np.cumsum(reference_counts) / max(np.sum(reference_counts), 1)
+    actual = np.cumsum(current_counts) / max(np.sum(current_counts), 1)
+    return float(np.max(np.abs(actual - expected)))
+
+def save_profile(profile, path):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(profile, f, indent=2)
+    os.replace(tmp_path, path)
+
+def load_profile(path):
+    """
+    Returns:
+        dict: Reference profile, or None if missing or unreadable
+    """
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,170 @@
+"""
+Micro Batcher Module
+Coalesces concurrent single-record scoring requests into vectorized batches.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+DEFAULT_MAX_BATCH_ROWS = 64
+DEFAULT_MAX_WAIT_MS = 2.0
+
+
+class MicroBatcher:
+    """
+    Collects records from many callers and scores them in one call.
+
+    A background thread takes the first waiting record, then keeps
+    collecting until max_batch_rows records are queued or max_wait_ms has
+    passed, calls score_fn once on the whole batch and resolves each
+    caller's future with its own result. If the batch call fails, each
+    record is scored on its own, so one bad record only fails its caller.
+    """
+
+    def __init__(self, score_fn, max_batch_rows=DEFAULT_MAX_BATCH_ROWS,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        """
+        Args:
+            score_fn: Callable taking a list of records, returning a list of results
+            max_batch_rows: Largest batch handed to score_fn
+            max_wait_ms: Longest a record waits for others to join its batch
+        """
+        self.score_fn = score_fn
+        self.max_batch_rows = max_batch_rows
+        self.max_wait_ms = max_wait_ms
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._metrics = {
+            'batches': 0,
+            'rows': 0,
+            'largest_batch': 0,
+            'wait_ms_total': 0.0,
+            'score_ms_total': 0.0
+        }
+
+        self._stopped = False
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, record):
+        """
+        Queue one record for scoring
+
+        Returns:
+            Future: Resolves to the record's result
+        """
+        future = Future()
+        # Under the lock, so no record is queued behind the close sentinel
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("MicroBatcher is closed")
+            self._queue.put((record, future, time.perf_counter()))
+        return future
+
+    def score(self, records):
+        """
+        Score records through the batcher, blocking until all are done
+
+        Args:
+            records: List of records
+
+        Returns:
+            list: Results in the same order
+        """
+        futures = [self.submit(record) for record in records]
+        return [future.result() for future in futures]
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_rows:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Finish this batch, then stop
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+
+            dispatched = time.perf_counter()
+            records = [record for record, _, _ in batch]
+            try:
+                results = self.score_fn(records)
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                    continue
+                self._score_each(batch)
+                results = None
+            scored = time.perf_counter()
+
+            if results is not None:
+                for (_, future, _), result in zip(batch, results):
+                    future.set_result(result)
+
+            with self._lock:
+                self._metrics['batches'] += 1
+                self._metrics['rows'] += len(batch)
+                self._metrics['largest_batch'] = max(self._metrics['largest_batch'], len(batch))
+                self._metrics['wait_ms_total'] += sum(
+                    (dispatched - queued) * 1000 for _, _, queued in batch
+                )
+                self._metrics['score_ms_total'] += (scored - dispatched) * 1000
+
+    def _score_each(self, batch):
+        """Score records one at a time, failing only the records that raise"""
+        for record, future, _ in batch:
+            try:
+                future.set_result(self.score_fn([record])[0])
+            except Exception as e:
+                future.set_exception(e)
+
+    def metrics(self):
+        """
+        Get batching counters
+
+        Returns:
+            dict: batches, rows, mean batch size, mean queue wait and mean score time
+        """
+        with self._lock:
+            m = dict(self._metrics)
+        batches = m['batches'] or 1
+        rows = m['rows'] or 1
+        return {
+            'max_batch_rows': self.max_batch_rows,
+            'max_wait_ms': self.max_wait_ms,
+            'batches': m['batches'],
+            'rows': m['rows'],
+            'largest_batch': m['largest_batch'],
+            'mean_batch_size': m['rows'] / batches,
+            'mean_wait_ms': m['wait_ms_total'] / rows,
+            'mean_score_ms_per_batch': m['score_ms_total'] / batches
+        }
+
+    def close(self):
+        """Stop the worker after queued records are scored"""
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            self._queue.put(None)
+        self._worker.join()
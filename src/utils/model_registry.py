@@ -0,0 +1,152 @@
+"""
+Model Registry Cache
+Keeps deserialized models in memory and reloads them only when the file on disk changes.
+"""
+
+import hashlib
+import os
+import threading
+
+import joblib
+
+
+def file_signature(path):
+    """
+    Cheap change signature for a file
+
+    Args:
+        path: File path
+
+    Returns:
+        tuple: (mtime_ns, size)
+    """
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """
+    SHA-256 of a file's contents
+
+    Args:
+        path: File path
+        chunk_size: Bytes read per iteration
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelCache:
+    """
+    Process-wide cache of loaded models keyed by file path.
+
+    Every lookup stats the file. If mtime and size are unchanged the cached
+    object is returned. If they changed, the file is hashed and only reloaded
+    when the contents actually differ (e.g. after a deploy or rollback).
+    """
+
+    def __init__(self, loader=joblib.load):
+        self.loader = loader
+        self._entries = {}
+        self._hashes = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def get(self, path, loader=None):
+        """
+        Return the model stored at path, loading it only if needed
+
+        Args:
+            path: Model file path
+            loader: Optional loader overriding the cache default
+
+        Returns:
+            object: Loaded model
+        """
+        loader = loader or self.loader
+        signature = file_signature(path)
+
+        with self._lock:
+            entry = self._entries.get(path)
+
+            if entry is not None and entry['signature'] == signature:
+                self.hits += 1
+                return entry['model']
+
+            content_hash = file_hash(path)
+            if entry is not None and entry['hash'] == content_hash:
+                # Touched but identical (e.g. copied back in place)
+                entry['signature'] = signature
+                self.hits += 1
+                return entry['model']
+
+            model = loader(path)
+            if entry is not None:
+                self.reloads += 1
+            self.misses += 1
+            self._entries[path] = {
+                'model': model,
+                'signature': signature,
+                'hash': content_hash
+            }
+            return model
+
+    def content_hash(self, path):
+        """
+        SHA-256 of a file, recomputed only when its mtime or size changes
+
+        Args:
+            path: File path
+
+        Returns:
+            str: Hex digest
+        """
+        signature = file_signature(path)
+        with self._lock:
+            memo = self._hashes.get(path)
+            if memo is not None and memo[0] == signature:
+                return memo[1]
+            content_hash = file_hash(path)
+            self._hashes[path] = (signature, content_hash)
+            return content_hash
+
+    def invalidate(self, path=None):
+        """
+        Drop one cached entry, or all entries when path is None
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._hashes.clear()
+            else:
+                self._entries.pop(path, None)
+                self._hashes.pop(path, None)
+
+    def stats(self):
+        """
+        Get cache counters
+
+        Returns:
+            dict: hits, misses, reloads and cached paths
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'reloads': self.reloads,
+                'cached': {
+                    path: entry['hash'][:12] for path, entry in self._entries.items()
+                }
+            }
+
+
+# Shared by every caller in this process
+model_cache = ModelCache()
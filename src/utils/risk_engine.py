@@ -1,12 +1,253 @@
 import pandas as pd
 import numpy as np
-import joblib
 import os
 import json
+import threading
+import time
+
+from utils.compiled_forest import MANIFEST_FILENAME, CompiledForest, compiled_path
+from utils.drift_monitor import DriftMonitor, recording_enabled
+from utils.model_registry import model_cache
 
 # Paths - Updated to use active model directory
 MODEL_PATH = r"c:\HDFC_Credit_Card\models\active\model.pkl"
 METADATA_PATH = r"c:\HDFC_Credit_Card\models\active\metadata.json"
+FALLBACK_MODEL_PATH = r"c:\HDFC_Credit_Card\models\risk_model.pkl"
+COMPILED_MODEL_DIR = r"c:\HDFC_Credit_Card\models\active\compiled"
+PROFILE_PATH = r"c:\HDFC_Credit_Card\models\active\reference_profile.json"
+DRIFT_STATE_DIR = r"c:\HDFC_Credit_Card\models\drift"
+SHADOW_DIR = r"c:\HDFC_Credit_Card\models\shadow"
+VERSIONS_DIR = r"c:\HDFC_Credit_Card\models\versions"
+
+# Batches up to this size use the compiled forest, which skips sklearn's
+# per-call overhead; larger batches go through the (multi-threaded) sklearn model
+COMPILED_MAX_ROWS = 256
+
+# Risk tier cut points on the 0-100 score (lower bound inclusive)
+ENGAGE_THRESHOLD = 30
+INTERVENE_THRESHOLD = 60
+TIER_LABELS = ['Monitor', 'Engage', 'Intervene']  # Blue, Yellow, Red
+
+# Optional online drift monitor fed by every scored batch
+_drift_monitor = None
+
+# Drift recording and shadow scoring are switched on for all scoring
+# processes by control files in DRIFT_STATE_DIR and SHADOW_DIR; they are
+# checked at most this often
+OBSERVER_SYNC_SECONDS = 5
+_observer_lock = threading.Lock()
+_observer_state = {
+    'checked': None, 'pid': os.getpid(), 'drift_recorder': False, 'shadow_scorer': False
+}
+
+# Optional candidate model scoring every batch in the background
+_shadow_scorer = None
+
+# Features (Must match training exactly)
+FEATURE_COLUMNS = ['utilisation_pct', 'avg_payment_ratio', 'min_due_paid_frequency', 
+                   'merchant_mix_index', 'cash_withdrawal_pct', 'recent_spend_change_pct']
+
+def load_active_model():
+    """
+    Get the active model from the process-wide cache
+    
+    The model is deserialized once per process and reloaded only when the
+    file on disk changes (deploy or rollback).
+    
+    Returns:
+        Fitted classifier
+    """
+    if os.path.exists(MODEL_PATH):
+        return model_cache.get(MODEL_PATH)
+    # Fallback to old model path if active model doesn't exist yet
+    if os.path.exists(FALLBACK_MODEL_PATH):
+        return model_cache.get(FALLBACK_MODEL_PATH)
+    raise FileNotFoundError(f"Model not found. Please train the model first.")
+
+def load_compiled_model():
+    """
+    Get the compiled (array-based) form of the active model, if available
+    
+    The compiled arrays are written at deploy time in a directory named
+    after the hash of the model.pkl they were built from, so only the form
+    matching the current active model is ever found. Its arrays are
+    memory-mapped, so loading is near-instant and the pages are shared
+    between scoring processes.
+    
+    Returns:
+        CompiledForest or None
+    """
+    if not os.path.exists(MODEL_PATH):
+        return None
+    manifest_path = os.path.join(
+        compiled_path(COMPILED_MODEL_DIR, model_cache.content_hash(MODEL_PATH)), MANIFEST_FILENAME
+    )
+    if not os.path.exists(manifest_path):
+        return None
+    return model_cache.get(manifest_path, loader=CompiledForest.load)
+
+def enable_drift_monitor(monitor):
+    """
+    Feed every batch scored in this process to a drift monitor
+    
+    Args:
+        monitor: utils.drift_monitor.DriftMonitor (or anything with update(X, scores))
+        
+    Returns:
+        The monitor
+    """
+    global _drift_monitor
+    _drift_monitor = monitor
+    _observer_state['drift_recorder'] = False
+    return monitor
+
+def disable_drift_monitor():
+    global _drift_monitor
+    _drift_monitor = None
+    _observer_state['drift_recorder'] = False
+
+def _sync_drift_recorder():
+    """Start or stop recording to DRIFT_STATE_DIR as its control file says"""
+    global _drift_monitor
+    enabled = recording_enabled(DRIFT_STATE_DIR)
+    if enabled and _drift_monitor is None:
+        _drift_monitor = DriftMonitor(profile_path=PROFILE_PATH, state_dir=DRIFT_STATE_DIR)
+        _observer_state['drift_recorder'] = True
+    elif not enabled and _observer_state['drift_recorder']:
+        monitor, _drift_monitor = _drift_monitor, None
+        _observer_state['drift_recorder'] = False
+        monitor.flush()
+
+def _sync_shadow_scorer():
+    """Start, switch or stop the shadow scorer as SHADOW_DIR's control file says"""
+    global _shadow_scorer
+    # Imported here: shadow_scorer imports this module
+    from utils.shadow_scorer import ShadowScorer, shadow_version
+    
+    version = shadow_version(SHADOW_DIR)
+    current = _shadow_scorer if _observer_state['shadow_scorer'] else None
+    if _shadow_scorer is not None and current is None:
+        # Enabled by hand in this process; leave it alone
+        return
+    if current is not None and current.version == version:
+        return
+    if current is not None:
+        _shadow_scorer = None
+        _observer_state['shadow_scorer'] = False
+        # Drains its queue without holding up this scoring call
+        threading.Thread(target=current.close, daemon=True).start()
+    if version is not None:
+        _shadow_scorer = ShadowScorer(
+            version, versions_dir=VERSIONS_DIR, shadow_dir=SHADOW_DIR,
+            active_model_path=MODEL_PATH
+        )
+        _observer_state['shadow_scorer'] = True
+
+def flush_observers(wait=False):
+    """
+    Write recorded drift counts and shadow aggregates now (e.g. before a worker process exits)
+    
+    Args:
+        wait: First let the shadow scorer finish the batches it has queued
+    """
+    monitor = _drift_monitor
+    if monitor is not None and hasattr(monitor, 'flush'):
+        monitor.flush()
+    shadow = _shadow_scorer
+    if shadow is not None and hasattr(shadow, 'flush'):
+        shadow.flush(wait=wait)
+
+def _forget_inherited_observers():
+    """
+    After a fork (e.g. batch pool workers), drop the observers started from
+    the control files in the parent: their files and worker thread are the parent's
+    """
+    global _drift_monitor, _shadow_scorer
+    if _observer_state['drift_recorder']:
+        _drift_monitor = None
+        _observer_state['drift_recorder'] = False
+    if _observer_state['shadow_scorer']:
+        _shadow_scorer = None
+        _observer_state['shadow_scorer'] = False
+    _observer_state['checked'] = None
+    _observer_state['pid'] = os.getpid()
+
+def _sync_observers():
+    """Poll the observer control files, at most every OBSERVER_SYNC_SECONDS"""
+    if _observer_state['pid'] != os.getpid():
+        _forget_inherited_observers()
+    now = time.monotonic()
+    checked = _observer_state['checked']
+    if checked is not None and now - checked < OBSERVER_SYNC_SECONDS:
+        return
+    # One thread checks; concurrent scoring calls don't wait for it
+    if not _observer_lock.acquire(blocking=False):
+        return
+    try:
+        _observer_state['checked'] = now
+        try:
+            _sync_drift_recorder()
+        except Exception as e:
+            print(f"Error syncing drift recording: {e}")
+        try:
+            _sync_shadow_scorer()
+        except Exception as e:
+            print(f"Error syncing shadow scoring: {e}")
+    finally:
+        _observer_lock.release()
+
+def _observe(X, scores):
+    """Hand a scored batch to the drift monitor and shadow scorer; never fails the scoring call"""
+    _sync_observers()
+    monitor = _drift_monitor
+    if monitor is not None:
+        try:
+            monitor.update(X, scores / 100)
+        except Exception as e:
+            print(f"Error updating drift monitor: {e}")
+    shadow = _shadow_scorer
+    if shadow is not None:
+        try:
+            # Only enqueues; the candidate scores in its own thread
+            shadow.submit(X, scores)
+        except Exception as e:
+            print(f"Error submitting shadow batch: {e}")
+
+def enable_shadow_scorer(scorer):
+    """
+    Shadow every batch scored in this process with a candidate model
+    
+    Args:
+        scorer: utils.shadow_scorer.ShadowScorer (or anything with submit(X, scores))
+        
+    Returns:
+        The scorer
+    """
+    global _shadow_scorer
+    _shadow_scorer = scorer
+    _observer_state['shadow_scorer'] = False
+    return scorer
+
+def disable_shadow_scorer():
+    """
+    Stop shadow scoring
+    
+    Returns:
+        The scorer that was enabled, or None
+    """
+    global _shadow_scorer
+    scorer, _shadow_scorer = _shadow_scorer, None
+    _observer_state['shadow_scorer'] = False
+    return scorer
+
+def get_model_cache_stats():
+    """
+    Get hit/miss counters of the model cache
+    
+    Returns:
+        dict: hits, misses, reloads and cached model hashes
+    """
+    return model_cache.stats()
 
 def predict_from_active_model(df):
     """
@@ -48,49 +289,96 @@ def get_active_model_info():
         print(f"Error loading model info: {e}")
         return {'version': 'unknown', 'date': 'N/A', 'accuracy': 0, 'auc': 0}
 
-def calculate_risk_scores(df):
+def risk_tier_codes(scores, engage_threshold=ENGAGE_THRESHOLD,
+                    intervene_threshold=INTERVENE_THRESHOLD):
+    """
+    Tier index (into TIER_LABELS) per score
+    
+    Args:
+        scores: Array-like of 0-100 risk scores
+        engage_threshold: Scores at or above this are 'Engage'
+        intervene_threshold: Scores at or above this are 'Intervene'
+        
+    Returns:
+        np.ndarray: 0 = Monitor, 1 = Engage, 2 = Intervene
+    """
+    if engage_threshold > intervene_threshold:
+        raise ValueError("engage_threshold must not exceed intervene_threshold")
+    return np.digitize(np.asarray(scores, dtype=np.float64),
+                       [engage_threshold, intervene_threshold])
+
+def assign_risk_tiers(scores, engage_threshold=ENGAGE_THRESHOLD,
+                      intervene_threshold=INTERVENE_THRESHOLD):
+    """
+    Bin risk scores into tiers in one vectorized pass
+    
+    Args:
+        scores: Array-like of 0-100 risk scores
+        engage_threshold: Scores at or above this are 'Engage'
+        intervene_threshold: Scores at or above this are 'Intervene'
+        
+    Returns:
+        pd.Categorical: Tier per score with categories TIER_LABELS
+    """
+    codes = risk_tier_codes(scores, engage_threshold, intervene_threshold)
+    return pd.Categorical.from_codes(codes, categories=TIER_LABELS)
+
+def score_features(X, observe=True):
+    """
+    Score a prepared feature matrix with the active model
+    
+    Small batches use the compiled forest when available, larger ones the
+    pickled sklearn model. Every path that scores customers goes through
+    here, so this is where drift monitoring and shadow scoring see the batch.
+    
+    Args:
+        X: DataFrame or array (n_samples, len(FEATURE_COLUMNS)), no missing values
+        observe: Feed the batch to the drift monitor and shadow scorer
+            (False for warm-up calls)
+        
+    Returns:
+        np.ndarray: float64 risk scores (0-100, one decimal)
+    """
+    clf = load_compiled_model() if len(X) <= COMPILED_MAX_ROWS else None
+    if clf is None:
+        clf = load_active_model()
+        if isinstance(X, np.ndarray) and hasattr(clf, 'feature_names_in_'):
+            X = pd.DataFrame(X, columns=FEATURE_COLUMNS)
+    
+    # Predict Probability of Delinquency (Class 1)
+    # predict_proba returns [prob_0, prob_1]
+    probs = clf.predict_proba(X)[:, 1]
+    
+    # Scale to 0-100 Risk Score
+    scores = np.round(probs * 100, 1)
+    if observe:
+        _observe(X, scores)
+    return scores
+
+def calculate_risk_scores(df, engage_threshold=ENGAGE_THRESHOLD,
+                          intervene_threshold=INTERVENE_THRESHOLD):
     """
     Calculates risk scores using the trained Random Forest model.
+    
+    Adds a float32 'risk_score' (0-100) and a categorical 'risk_tier' column.
     """
     if df is None or df.empty:
         return None
         
     try:
-        # Load Model from active directory
-        if not os.path.exists(MODEL_PATH):
-            # Fallback to old model path if active model doesn't exist yet
-            fallback_path = r"c:\HDFC_Credit_Card\models\risk_model.pkl"
-            if os.path.exists(fallback_path):
-                clf = joblib.load(fallback_path)
-            else:
-                raise FileNotFoundError(f"Model not found. Please train the model first.")
-        else:
-            clf = joblib.load(MODEL_PATH)
-        
-        # Features (Must match training exactly)
-        features = ['utilisation_pct', 'avg_payment_ratio', 'min_due_paid_frequency', 
-                    'merchant_mix_index', 'cash_withdrawal_pct', 'recent_spend_change_pct']
-        
         # Prepare X (Handle missing values same as training)
-        X = df[features].fillna(0)
+        X = df[FEATURE_COLUMNS].fillna(0)
         
-        # Predict Probability of Delinquency (Class 1)
-        # predict_proba returns [prob_0, prob_1]
-        probs = clf.predict_proba(X)[:, 1]
-        
-        # Scale to 0-100 Risk Score
-        df['risk_score'] = (probs * 100).round(1)
+        # Model comes from the per-process cache
+        scores = score_features(X)
         
         # --- Risk Tiers ---
-        def assign_tier(score):
-            if score >= 60:
-                return 'Intervene'  # High Risk -> Intervene (Red)
-            elif score >= 30:
-                return 'Engage'     # Emerging Risk -> Engage (Yellow)
-            else:
-                return 'Monitor'    # Low Risk -> Monitor (Blue)
-                
-        df['risk_tier'] = df['risk_score'].apply(assign_tier)
+        # Bin on the float64 scores so float32 storage never moves a
+        # score across a cut point
+        tiers = assign_risk_tiers(scores, engage_threshold, intervene_threshold)
+        
+        df['risk_score'] = scores.astype(np.float32)
+        df['risk_tier'] = tiers
         
         return df
         
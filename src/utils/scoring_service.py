@@ -0,0 +1,195 @@
+"""
+Scoring Service Module
+Low-latency scoring of single customers or small batches over the active model,
+with an optional local HTTP endpoint.
+"""
+
+import json
+import logging
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from utils.micro_batcher import DEFAULT_MAX_BATCH_ROWS, DEFAULT_MAX_WAIT_MS, MicroBatcher
+from utils.risk_engine import (
+    FEATURE_COLUMNS, TIER_LABELS, get_active_model_info, risk_tier_codes,
+    get_model_cache_stats, load_active_model, load_compiled_model, score_features
+)
+
+MAX_BATCH_SIZE = 1000
+
+
+class ScoringService:
+    """
+    Scores plain dict records without building a pandas frame.
+
+    The active model (and its compiled form, if deployed) is loaded when
+    the service starts, so the first request does not pay the load cost.
+    With batching enabled, concurrent requests are coalesced by a
+    MicroBatcher and scored in one vectorized call. Records are converted
+    before they are queued, so malformed input is rejected for its own
+    request only.
+    """
+
+    def __init__(self, max_batch_size=MAX_BATCH_SIZE, batching=False,
+                 max_batch_rows=DEFAULT_MAX_BATCH_ROWS, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.max_batch_size = max_batch_size
+        self.warm_up()
+        self.batcher = None
+        if batching:
+            self.batcher = MicroBatcher(self._score_batch, max_batch_rows, max_wait_ms)
+
+    def warm_up(self):
+        """Load the active model into the process cache and run one prediction"""
+        load_active_model()
+        load_compiled_model()
+        score_features(np.zeros((1, len(FEATURE_COLUMNS))), observe=False)
+
+    def records_to_matrix(self, records):
+        """
+        Build the feature matrix straight from dict records
+
+        Missing or null features become 0, as in calculate_risk_scores.
+        """
+        X = np.zeros((len(records), len(FEATURE_COLUMNS)), dtype=np.float64)
+        for i, record in enumerate(records):
+            for j, col in enumerate(FEATURE_COLUMNS):
+                value = record.get(col)
+                if value is not None:
+                    X[i, j] = float(value)
+        # NaN values (e.g. float('nan') from the client) too, as fillna(0) does
+        X[np.isnan(X)] = 0
+        return X
+
+    def score(self, records):
+        """
+        Score one record or a small batch
+
+        Args:
+            records: dict or list of dicts with customer_id and feature values
+
+        Returns:
+            list: dicts with customer_id, risk_score and risk_tier
+        """
+        if isinstance(records, dict):
+            records = [records]
+        if not records:
+            return []
+        if len(records) > self.max_batch_size:
+            raise ValueError(f"Batch of {len(records)} exceeds max_batch_size {self.max_batch_size}")
+
+        X = self.records_to_matrix(records)
+        if self.batcher is not None:
+            return self.batcher.score(list(zip(records, X)))
+        return self._score_matrix(records, X)
+
+    def _score_batch(self, items):
+        """Score (record, feature row) pairs coalesced by the batcher"""
+        records = [record for record, _ in items]
+        return self._score_matrix(records, np.vstack([row for _, row in items]))
+
+    def _score_matrix(self, records, X):
+        scores = score_features(X)
+        # Plain list lookup; a pandas Categorical costs more than the model here
+        tiers = [TIER_LABELS[code] for code in risk_tier_codes(scores)]
+
+        return [
+            {
+                'customer_id': record.get('customer_id'),
+                'risk_score': float(score),
+                'risk_tier': tier
+            }
+            for record, score, tier in zip(records, scores, tiers)
+        ]
+
+    def health(self):
+        """Active model version and cache counters"""
+        health = {
+            'status': 'ok',
+            'model': get_active_model_info(),
+            'model_cache': get_model_cache_stats()
+        }
+        if self.batcher is not None:
+            health['batching'] = self.batcher.metrics()
+        return health
+
+    def close(self):
+        if self.batcher is not None:
+            self.batcher.close()
+
+
+def make_handler(service):
+    """Build a request handler class bound to a ScoringService"""
+
+    class ScoringRequestHandler(BaseHTTPRequestHandler):
+        # Keep-alive, so clients don't pay a TCP handshake per request
+        protocol_version = 'HTTP/1.1'
+        # Headers and body are written separately; without TCP_NODELAY the
+        # body waits on the client's delayed ACK (~40 ms)
+        disable_nagle_algorithm = True
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send_json(200, service.health())
+            else:
+                self._send_json(404, {'error': 'Not found'})
+
+        def do_POST(self):
+            if self.path != '/score':
+                self._send_json(404, {'error': 'Not found'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'null')
+                # Accept a record, a list of records or {"records": [...]}
+                if isinstance(payload, dict) and 'records' in payload:
+                    payload = payload['records']
+                if not isinstance(payload, (dict, list)):
+                    raise ValueError("Expected a JSON object or list of objects")
+
+                start = time.perf_counter()
+                results = service.score(payload)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                self._send_json(200, {'results': results, 'latency_ms': elapsed_ms})
+            except (ValueError, TypeError, AttributeError) as e:
+                self._send_json(400, {'error': str(e)})
+            except Exception as e:
+                logging.error(f"Error scoring request: {str(e)}")
+                self._send_json(500, {'error': str(e)})
+
+        def log_message(self, format, *args):
+            # Per-request access logs would dominate latency
+            pass
+
+    return ScoringRequestHandler
+
+
+def run_server(host='127.0.0.1', port=8502, service=None):
+    """
+    Serve POST /score and GET /health until interrupted
+
+    Args:
+        host: Interface to bind
+        port: Port to listen on
+        service: Optional pre-built ScoringService
+    """
+    service = service or ScoringService()
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"Scoring service listening on http://{host}:{port}")
+    print("Press Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nScoring service stopped")
+    finally:
+        server.server_close()
+        service.close()
@@ -0,0 +1,347 @@
+"""
+Shadow Scorer Module
+Scores live batches with a candidate model version next to the active model,
+off the scoring path, and aggregates how the two disagree.
+
+Scoring runs in several processes (the dashboard, the scoring service,
+batch workers), so shadowing is switched on for all of them by a control
+file in the shadow directory, each process writes its own aggregates, and
+load_shadow_summary() sums them.
+"""
+
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from utils.model_registry import file_hash, file_signature
+from utils.risk_engine import (
+    ENGAGE_THRESHOLD, FEATURE_COLUMNS, INTERVENE_THRESHOLD, TIER_LABELS, risk_tier_codes
+)
+
+DEFAULT_VERSIONS_DIR = 'models/versions'
+DEFAULT_SHADOW_DIR = 'models/shadow'
+DEFAULT_ACTIVE_MODEL_PATH = 'models/active/model.pkl'
+CONTROL_FILENAME = 'control.json'
+N_TIERS = len(TIER_LABELS)
+
+# Summed across processes by load_shadow_summary
+SUM_FIELDS = (
+    'rows', 'batches', 'dropped_batches', 'errors', 'sum_active_score',
+    'sum_candidate_score', 'sum_delta', 'sum_abs_delta', 'sum_sq_delta'
+)
+
+
+def shadow_path(shadow_dir, version):
+    """Directory of a candidate version's per-process aggregate files"""
+    return os.path.join(shadow_dir, f"shadow_v{version.replace('.', '_')}")
+
+
+def set_shadow_version(shadow_dir, version):
+    """
+    Shadow a candidate version in every scoring process (None to stop)
+
+    Scoring processes poll the control file (see risk_engine) and start or
+    stop their shadow scorer on their own.
+    """
+    os.makedirs(shadow_dir, exist_ok=True)
+    path = os.path.join(shadow_dir, CONTROL_FILENAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': version}, f)
+    os.replace(tmp_path, path)
+
+
+def shadow_version(shadow_dir):
+    """Candidate version the control file asks to shadow, or None"""
+    try:
+        with open(os.path.join(shadow_dir, CONTROL_FILENAME), 'r') as f:
+            return json.load(f).get('version')
+    except (OSError, ValueError):
+        return None
+
+
+def summarize(summary):
+    """
+    Add derived rates to summed shadow aggregates
+
+    Returns:
+        dict: The aggregates plus mean_delta, mean_abs_delta, rmse_delta,
+            mean scores, tier_flips, flip_rate, escalations, de_escalations
+    """
+    summary = dict(summary)
+    rows = max(summary['rows'], 1)
+    transitions = np.asarray(summary['tier_transitions'])
+    flips = int(transitions.sum() - np.trace(transitions))
+    summary.update({
+        'mean_active_score': summary['sum_active_score'] / rows,
+        'mean_candidate_score': summary['sum_candidate_score'] / rows,
+        'mean_delta': summary['sum_delta'] / rows,
+        'mean_abs_delta': summary['sum_abs_delta'] / rows,
+        'rmse_delta': float(np.sqrt(summary['sum_sq_delta'] / rows)),
+        'tier_flips': flips,
+        'flip_rate': flips / rows,
+        # Candidate puts the customer in a higher / lower tier
+        'escalations': int(np.triu(transitions, 1).sum()),
+        'de_escalations': int(np.tril(transitions, -1).sum())
+    })
+    return summary
+
+
+def load_shadow_summary(shadow_dir, version, active_model_hash=None):
+    """
+    Sum the aggregates every process wrote for a candidate version
+
+    Args:
+        shadow_dir: Directory of the aggregate files
+        version: Candidate version
+        active_model_hash: Only count rows compared with this active model;
+            by default, the active model of the most recently written file
+
+    Returns:
+        dict: Summed aggregates with derived rates (see summarize), or None
+            if nothing was recorded
+    """
+    directory = shadow_path(shadow_dir, version)
+    states = []
+    for filename in os.listdir(directory) if os.path.isdir(directory) else []:
+        if not filename.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, filename), 'r') as f:
+                states.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    if active_model_hash is None and states:
+        active_model_hash = max(states, key=lambda s: s['updated'])['active_model_hash']
+    states = [s for s in states if s.get('active_model_hash') == active_model_hash]
+    if not states:
+        return None
+
+    total = {
+        'candidate_version': version,
+        'active_model_hash': active_model_hash,
+        'processes': len(states),
+        'started': min(s['started'] for s in states),
+        'updated': max(s['updated'] for s in states),
+        'max_abs_delta': max(s['max_abs_delta'] for s in states),
+        'tier_transitions': np.sum(
+            [np.asarray(s['tier_transitions'], dtype=np.int64) for s in states], axis=0
+        ).tolist()
+    }
+    for field in SUM_FIELDS:
+        total[field] = sum(s[field] for s in states)
+    return summarize(total)
+
+
+class ShadowScorer:
+    """
+    Scores every submitted batch with a candidate model in a background thread.
+
+    submit() only enqueues the batch and the active model's scores, so the
+    primary scoring call never waits for the candidate. The queue is bounded;
+    when the worker falls behind, batches are dropped and counted rather than
+    buffered. Score deltas (candidate - active, 0-100 scale) and tier
+    transitions are accumulated and written to this process's file under
+    models/shadow/shadow_vX_Y/ at most every flush_seconds and on close().
+    The aggregates are tied to the active model's content hash and restart
+    when the active model changes.
+
+    The candidate is loaded once by the worker itself, not through the shared
+    model cache, so its load never holds up the active model's lookups, and
+    a random forest candidate is pinned to one thread.
+    """
+
+    def __init__(self, version, versions_dir=DEFAULT_VERSIONS_DIR, shadow_dir=DEFAULT_SHADOW_DIR,
+                 active_model_path=DEFAULT_ACTIVE_MODEL_PATH, max_queue_batches=64,
+                 flush_seconds=30, engage_threshold=ENGAGE_THRESHOLD,
+                 intervene_threshold=INTERVENE_THRESHOLD):
+        """
+        Args:
+            version: Candidate model version to shadow
+            versions_dir: Directory of the version pickles
+            shadow_dir: Directory of the aggregate files
+            active_model_path: Active model the candidate is compared with
+            max_queue_batches: Batches waiting for the worker before new ones are dropped
+            flush_seconds: Minimum time between aggregate file writes
+            engage_threshold: Scores at or above this are 'Engage'
+            intervene_threshold: Scores at or above this are 'Intervene'
+        """
+        self.version = version
+        self.model_path = os.path.join(versions_dir, f"model_v{version.replace('.', '_')}.pkl")
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(f"Model version {version} not found")
+        self.shadow_dir = shadow_dir
+        # One file per process; started-at keeps a reused pid apart
+        self.path = os.path.join(
+            shadow_path(shadow_dir, version),
+            f"{socket.gethostname()}_{os.getpid()}_{int(time.time())}.json"
+        )
+        self.active_model_path = active_model_path
+        self.flush_seconds = flush_seconds
+        self.engage_threshold = engage_threshold
+        self.intervene_threshold = intervene_threshold
+
+        self._queue = queue.Queue(maxsize=max_queue_batches)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._model = None
+        self._active = None  # (signature, content hash) of the active model
+        self._summary = None
+        self._last_flush = 0.0
+        self._dropped = 0
+        self._thread = threading.Thread(target=self._run, name=f'shadow-v{version}', daemon=True)
+        self._thread.start()
+
+    def submit(self, X, active_scores):
+        """
+        Queue a scored batch for the candidate model; never blocks
+
+        Args:
+            X: Feature DataFrame or array the active model scored (not
+                modified afterwards)
+            active_scores: Active model's 0-100 scores for X
+
+        Returns:
+            bool: False if the queue was full and the batch was dropped
+        """
+        try:
+            self._queue.put_nowait((X, np.asarray(active_scores, dtype=np.float64)))
+            return True
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+            return False
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    self.flush()
+                    return
+                self._score(*item)
+                if time.monotonic() - self._last_flush >= self.flush_seconds:
+                    self.flush()
+            except Exception as e:
+                # The shadow model must never affect the active scoring path
+                logging.error(f"Shadow scoring of version {self.version} failed: {e}")
+                with self._lock:
+                    if self._summary is not None:
+                        self._summary['errors'] += 1
+            finally:
+                self._queue.task_done()
+
+    def _load_candidate(self):
+        model = joblib.load(self.model_path)
+        # Prior-corrected models wrap the fitted estimator
+        estimator = getattr(model, 'model', model)
+        if hasattr(estimator, 'n_jobs'):
+            estimator.n_jobs = 1
+        return model
+
+    def _active_hash(self):
+        """Content hash of the active model, rehashed only when the file changes"""
+        signature = file_signature(self.active_model_path)
+        if self._active is None or self._active[0] != signature:
+            self._active = (signature, file_hash(self.active_model_path))
+        return self._active[1]
+
+    def _score(self, X, active_scores):
+        active_hash = self._active_hash()
+        if self._model is None:
+            self._model = self._load_candidate()
+        if isinstance(X, np.ndarray) and hasattr(self._model, 'feature_names_in_'):
+            X = pd.DataFrame(X, columns=FEATURE_COLUMNS)
+        candidate_scores = np.round(self._model.predict_proba(X)[:, 1] * 100, 1)
+
+        delta = candidate_scores - active_scores
+        active_tiers = risk_tier_codes(active_scores, self.engage_threshold, self.intervene_threshold)
+        candidate_tiers = risk_tier_codes(candidate_scores, self.engage_threshold, self.intervene_threshold)
+        transitions = np.bincount(
+            active_tiers * N_TIERS + candidate_tiers, minlength=N_TIERS * N_TIERS
+        ).reshape(N_TIERS, N_TIERS)
+
+        with self._lock:
+            if self._summary is None or self._summary['active_model_hash'] != active_hash:
+                self._summary = self._new_summary(active_hash)
+            s = self._summary
+            s['rows'] += len(delta)
+            s['batches'] += 1
+            s['sum_active_score'] += float(active_scores.sum())
+            s['sum_candidate_score'] += float(candidate_scores.sum())
+            s['sum_delta'] += float(delta.sum())
+            s['sum_abs_delta'] += float(np.abs(delta).sum())
+            s['sum_sq_delta'] += float(np.square(delta).sum())
+            s['max_abs_delta'] = max(s['max_abs_delta'], float(np.abs(delta).max(initial=0.0)))
+            s['tier_transitions'] = (np.asarray(s['tier_transitions']) + transitions).tolist()
+
+    def _new_summary(self, active_hash):
+        return {
+            'candidate_version': self.version,
+            'active_model_hash': active_hash,
+            'started': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'rows': 0,
+            'batches': 0,
+            'dropped_batches': 0,
+            'errors': 0,
+            'sum_active_score': 0.0,
+            'sum_candidate_score': 0.0,
+            'sum_delta': 0.0,
+            'sum_abs_delta': 0.0,
+            'sum_sq_delta': 0.0,
+            'max_abs_delta': 0.0,
+            'tier_transitions': np.zeros((N_TIERS, N_TIERS), dtype=np.int64).tolist()
+        }
+
+    def status(self):
+        """
+        This process's aggregates with derived rates
+
+        Returns:
+            dict: rows, batches, dropped_batches, errors, mean_delta,
+                mean_abs_delta, rmse_delta, max_abs_delta, mean scores,
+                tier_transitions [active tier][candidate tier], tier_flips,
+                flip_rate, escalations, de_escalations; None before the
+                first batch
+        """
+        with self._lock:
+            if self._summary is None:
+                return None
+            self._summary['dropped_batches'] += self._dropped
+            self._dropped = 0
+            summary = dict(self._summary)
+        summary['updated'] = time.strftime('%Y-%m-%d %H:%M:%S')
+        return summarize(summary)
+
+    def flush(self, wait=False):
+        """
+        Write this process's aggregates now
+
+        Args:
+            wait: First let the worker score every queued batch
+        """
+        if wait:
+            self._queue.join()
+        with self._write_lock:
+            self._last_flush = time.monotonic()
+            summary = self.status()
+            if summary is None:
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(summary, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def close(self, timeout=None):
+        """Score the queued batches, write the aggregates and stop the worker"""
+        self._queue.put(None)
+        self._thread.join(timeout)